@@ -1,81 +1,661 @@
 
 // backend/app/services/analytics_service.py
-from typing import Dict, List
+import asyncio
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import (
+    silhouette_score,
+    calinski_harabasz_score,
+    davies_bouldin_score
+)
 from app.models import Project, Transaction, Risk, Progress
 from app.utils.ml import MLEngine
+from app.utils.compute_pool import compute_executor
+from app.utils.task_graph import TaskGraph
+from app.services.anomaly_stream import (
+    StreamingAnomalyDetector,
+    to_naive_utc
+)
+from app.services.change_feed import ChangeFeed, change_feed
+from app.utils.accumulators import (
+    CorrelationStore,
+    MomentsAccumulator,
+    TrendAccumulator
+)
+
+def _fit_reduction(
+    data: pd.DataFrame,
+    n_components: int,
+    solver: str
+) -> Tuple[Pipeline, np.ndarray]:
+    """Fit a scaling + PCA pipeline and reduce data with it
+    (runs in a compute worker)"""
+    if solver == 'incremental':
+        pca = IncrementalPCA(n_components=n_components, batch_size=10_000)
+    else:
+        pca = PCA(n_components=n_components, svd_solver=solver)
+        
+    pipeline = make_pipeline(StandardScaler(), pca)
+    return pipeline, pipeline.fit_transform(data)
+
+def _minibatch_cluster(
+    data: np.ndarray,
+    n_clusters: int,
+    batch_size: int,
+    seed: int
+) -> MiniBatchKMeans:
+    """Cluster a large dataset with mini-batch k-means
+    (runs in a compute worker)"""
+    return MiniBatchKMeans(
+        n_clusters=n_clusters,
+        batch_size=batch_size,
+        random_state=seed,
+        n_init=3
+    ).fit(data)
+
+def _stratified_sample(
+    labels: np.ndarray,
+    size: int,
+    seed: int
+) -> np.ndarray:
+    """Pick row indices so every cluster keeps its share of the sample"""
+    if size >= len(labels):
+        return np.arange(len(labels))
+        
+    rng = np.random.default_rng(seed)
+    clusters, counts = np.unique(labels, return_counts=True)
+    quotas = np.maximum(np.round(counts / len(labels) * size), 1).astype(int)
+    
+    return np.sort(np.concatenate([
+        rng.choice(
+            np.flatnonzero(labels == cluster),
+            size=min(quota, count),
+            replace=False
+        )
+        for cluster, count, quota in zip(clusters, counts, quotas)
+    ]))
+
+def _score_clusters(
+    data: np.ndarray,
+    labels: np.ndarray
+) -> Dict:
+    """Score a clustering (runs in a compute worker)"""
+    return {
+        "silhouette": silhouette_score(data, labels),
+        "calinski": calinski_harabasz_score(data, labels),
+        "davies": davies_bouldin_score(data, labels)
+    }
+
+REPORT_SECTIONS = ("summary", "trends", "correlations", "anomalies", "predictions")
+INSIGHT_SECTIONS = ("clusters", "patterns", "recommendations", "importance")
+
+# Sections cheap enough, and sensitive enough to new rows, to recompute
+# when only a handful of rows changed since a report was cached
+INCREMENTAL_SECTIONS = ("summary", "trends", "correlations", "anomalies")
+
+SOURCE_TABLES = {
+    "projects": Project,
+    "transactions": Transaction,
+    "risks": Risk,
+    "progress": Progress
+}
 
 class AnalyticsService:
-    def __init__(self):
+    def __init__(
+        self,
+        n_components: int = 3,
+        chunk_size: int = 50_000,
+        pca_solver: str = 'auto',
+        large_frame_rows: int = 100_000,
+        max_cached_pipelines: int = 32,
+        scalable_clustering_rows: int = 50_000,
+        max_cached_reports: int = 16,
+        incremental_max_new_rows: int = 1000,
+        feed: Optional[ChangeFeed] = None,
+        correlation_bucket: str = 'D'
+    ):
         self.ml_engine = MLEngine()
-        self.scaler = StandardScaler()
-        self.pca = PCA(n_components=3)
+        self.n_components = n_components
+        self.chunk_size = chunk_size
+        self.pca_solver = pca_solver
+        self.large_frame_rows = large_frame_rows
+        self.max_cached_pipelines = max_cached_pipelines
+        self.scalable_clustering_rows = scalable_clustering_rows
+        self._pipelines: "OrderedDict[str, Pipeline]" = OrderedDict()
+        self.max_cached_reports = max_cached_reports
+        self.incremental_max_new_rows = incremental_max_new_rows
+        self._reports: "OrderedDict[str, Dict]" = OrderedDict()
+        self.feed = feed or change_feed
+        self.anomaly_detector: StreamingAnomalyDetector = self.feed.detector
+        self.correlation_bucket = correlation_bucket
+        self._correlation_stores: "OrderedDict[str, Dict]" = OrderedDict()
+        self._correlation_lock = threading.Lock()
 
     async def generate_advanced_report(
         self,
         config: Dict
     ) -> Dict:
         """Generate comprehensive analytical report"""
+        # The anomaly detector only sees changes while the feed runs
+        self.feed.start()
+        
+        if config.get('streaming'):
+            return await self._generate_streaming_report(config)
+            
+        watermarks = await self._get_watermarks(config)
+        
+        if not config.get('cache', True):
+            return await self._compute_report(config, watermarks=watermarks)
+            
+        key = self._config_hash(config)
+        cached = self._reports.get(key)
+        
+        if cached is not None and cached["watermarks"] == watermarks:
+            self._reports.move_to_end(key)
+            return {
+                **cached["report"],
+                "cache": {
+                    "status": "hit",
+                    **self._staleness(cached["report"], cached["staleRows"])
+                }
+            }
+            
+        stale_rows = None
+        if cached is not None:
+            stale_rows = self._stale_rows(cached, watermarks)
+            
+        if stale_rows is not None:
+            # Keep the expensive model-based sections, refresh the rest
+            partial = await self._compute_report(
+                config,
+                INCREMENTAL_SECTIONS,
+                watermarks
+            )
+            report = {
+                **cached["report"],
+                **partial,
+                "insights": {
+                    **cached["report"]["insights"],
+                    **partial["insights"]
+                }
+            }
+            status = {
+                "status": "partial",
+                "recomputed": list(INCREMENTAL_SECTIONS),
+                **self._staleness(report, stale_rows)
+            }
+        else:
+            report = await self._compute_report(config, watermarks=watermarks)
+            stale_rows = 0
+            status = {"status": "miss"}
+            
+        self._reports[key] = {
+            "watermarks": watermarks,
+            "report": report,
+            "staleRows": stale_rows
+        }
+        self._reports.move_to_end(key)
+        while len(self._reports) > self.max_cached_reports:
+            self._reports.popitem(last=False)
+            
+        return {**report, "cache": status}
+
+    async def _compute_report(
+        self,
+        config: Dict,
+        sections: Optional[Iterable[str]] = None,
+        watermarks: Optional[Dict[str, Dict]] = None
+    ) -> Dict:
+        """Compute report sections from freshly fetched data"""
         # Fetch raw data
         raw_data = await self._fetch_data(config)
         
         # Process and transform data
         processed_data = self._process_data(raw_data, config)
         
-        # Generate analytics
+        # Generate analytics and ML insights as one graph: scaling/PCA runs
+        # once for every step that needs it, the rest run side by side
+        results, timings = await self._build_report_graph(
+            processed_data,
+            config,
+            sections,
+            watermarks
+        ).run()
+        
         analytics = {
-            "summary": self._generate_summary(processed_data),
-            "trends": await self._analyze_trends(processed_data),
-            "correlations": self._analyze_correlations(processed_data),
-            "anomalies": await self._detect_anomalies(processed_data),
-            "predictions": await self._generate_predictions(processed_data)
+            section: results[section]
+            for section in REPORT_SECTIONS
+            if section in results
         }
-        
-        # Add ML insights
-        analytics["insights"] = await self._generate_ml_insights(processed_data)
+        analytics["insights"] = {
+            section: results[section]
+            for section in INSIGHT_SECTIONS
+            if section in results
+        }
+        analytics["timings"] = timings
         
         return analytics
 
-    async def _generate_ml_insights(
+    def _config_hash(self, config: Dict) -> str:
+        """Hash a report config independent of key order"""
+        canonical = json.dumps(config, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    async def _get_watermarks(self, config: Dict) -> Dict[str, Dict]:
+        """Get the data version of every table the report reads.
+
+        `modified` moves on in-place updates and deletes only, so it tells
+        appended rows apart from changed ones.
+        """
+        sources = config.get('sources', list(SOURCE_TABLES))
+        marks = await asyncio.gather(*[
+            SOURCE_TABLES[source].watermark() for source in sources
+        ])
+        
+        return {
+            source: {
+                "version": str(version),
+                "rows": rows,
+                "modified": str(modified)
+            }
+            for source, (version, rows, modified) in zip(sources, marks)
+        }
+
+    def _stale_rows(
         self,
-        data: pd.DataFrame
+        cached: Dict,
+        watermarks: Dict[str, Dict]
+    ) -> Optional[int]:
+        """Count appended rows the cached model-based sections haven't seen.
+
+        Rows add up across partial refreshes, so the kept sections are
+        rebuilt (None) once they lag by more than `incremental_max_new_rows`
+        or as soon as any row was updated or deleted.
+        """
+        added = self._appended_rows(cached["watermarks"], watermarks)
+        if added is None:
+            return None
+            
+        stale_rows = cached["staleRows"] + added
+        if stale_rows > self.incremental_max_new_rows:
+            return None
+            
+        return stale_rows
+
+    def _staleness(self, report: Dict, stale_rows: int) -> Dict:
+        """Describe which sections of a report predate its newest rows"""
+        if not stale_rows:
+            return {}
+            
+        return {
+            "stale": [
+                section for section in REPORT_SECTIONS
+                if section in report and section not in INCREMENTAL_SECTIONS
+            ] + [
+                section for section in INSIGHT_SECTIONS
+                if section in report["insights"]
+            ],
+            "staleRows": stale_rows
+        }
+
+    def _appended_rows(
+        self,
+        previous: Dict[str, Dict],
+        current: Dict[str, Dict]
+    ) -> Optional[int]:
+        """Count rows appended since `previous`, or None on any other change"""
+        if previous.keys() != current.keys():
+            return None
+            
+        added = []
+        
+        for source in current:
+            before, after = previous[source], current[source]
+            count = after["rows"] - before["rows"]
+            
+            # Updated or deleted rows can shift any section, including a
+            # delete balanced by an insert, so they force a full rebuild
+            if before.get("modified") != after.get("modified"):
+                return None
+            if count < 0 or (
+                count == 0 and before["version"] != after["version"]
+            ):
+                return None
+                
+            added.append(count)
+            
+        return sum(added)
+
+    def _build_report_graph(
+        self,
+        data: pd.DataFrame,
+        config: Dict,
+        sections: Optional[Iterable[str]] = None,
+        watermarks: Optional[Dict[str, Dict]] = None
+    ) -> TaskGraph:
+        """Lay out report sections and their shared inputs"""
+        graph = TaskGraph()
+        wanted = set(sections or REPORT_SECTIONS + INSIGHT_SECTIONS)
+        
+        # Feature importance needs more than one column
+        if data.shape[1] <= 1:
+            wanted.discard("importance")
+        
+        steps = {
+            # Synchronous sections run on worker threads
+            "summary": lambda: asyncio.to_thread(self._generate_summary, data),
+            "correlations": lambda: asyncio.to_thread(
+                self._analyze_correlations,
+                data,
+                config,
+                watermarks
+            ),
+            "trends": lambda: self._analyze_trends(data),
+            "anomalies": lambda: self._get_anomalies(data, config),
+            "predictions": lambda: self._generate_predictions(data),
+            "patterns": lambda: self._detect_patterns(data),
+            "recommendations": lambda: self._generate_recommendations(data),
+            "importance": lambda: self._analyze_feature_importance(data)
+        }
+        
+        if "clusters" in wanted:
+            graph.add(
+                "reduced",
+                lambda: self._reduce_dimensions(
+                    data,
+                    config.get('pcaSolver', self.pca_solver)
+                )
+            )
+            graph.add(
+                "clusters",
+                lambda reduced: self._perform_clustering(
+                    reduced,
+                    config.get('clustering', {})
+                ),
+                depends_on=["reduced"]
+            )
+            
+        for name, step in steps.items():
+            if name in wanted:
+                graph.add(name, step)
+                
+        return graph
+
+    def _analyze_correlations(
+        self,
+        data: pd.DataFrame,
+        config: Dict,
+        watermarks: Optional[Dict[str, Dict]] = None
+    ) -> pd.DataFrame:
+        """Get correlations from co-moments kept across reports.
+
+        When the source tables only gained rows since the previous report
+        for the same config, and those rows landed after the ones already
+        folded in, only the new rows are scanned. Any other change rebuilds
+        the store. The requested window is then merged from time buckets.
+        """
+        key = self._config_hash({
+            k: v for k, v in config.items() if k != 'correlationWindow'
+        })
+        columns = list(data.select_dtypes(include='number').columns)
+        
+        with self._correlation_lock:
+            entry = self._correlation_stores.get(key)
+            store = entry["store"] if entry is not None else None
+            
+            # Updated, deleted or reordered rows leave the stored co-moments
+            # wrong, so the store is reused only when the previous rows are
+            # untouched and still form the head of the frame
+            if (
+                store is None
+                or watermarks is None
+                or store.columns != columns
+                or store.rows > len(data)
+                or self._appended_rows(entry["watermarks"], watermarks) is None
+                or self._fingerprint(data.iloc[:store.rows])
+                != entry["fingerprint"]
+            ):
+                store = CorrelationStore(
+                    columns,
+                    freq=config.get('correlationBucket', self.correlation_bucket)
+                )
+                
+            store.update(data.iloc[store.rows:])
+            
+            self._correlation_stores[key] = {
+                "store": store,
+                "watermarks": watermarks,
+                "fingerprint": self._fingerprint(data)
+            }
+            self._correlation_stores.move_to_end(key)
+            while len(self._correlation_stores) > self.max_cached_reports:
+                self._correlation_stores.popitem(last=False)
+                
+            return store.correlation(*self._correlation_window(config))
+
+    def _correlation_window(
+        self,
+        config: Dict
+    ) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        """Get the requested correlation window bounds"""
+        window = config.get('correlationWindow') or {}
+        
+        return tuple(
+            pd.Timestamp(window[bound]) if window.get(bound) else None
+            for bound in ('start', 'end')
+        )
+
+    async def _get_anomalies(
+        self,
+        data: pd.DataFrame,
+        config: Dict
     ) -> Dict:
-        """Generate machine learning based insights"""
-        insights = {
-            "clusters": await self._perform_clustering(data),
-            "patterns": await self._detect_patterns(data),
-            "recommendations": await self._generate_recommendations(data)
+        """Get anomalies from the stream detector, or detect them in batch"""
+        date_range = config.get('dateRange') or {}
+        bounds = [
+            to_naive_utc(value)
+            for value in (
+                config.get('anomaliesSince') or date_range.get('start'),
+                date_range.get('end')
+            )
+        ]
+        
+        # The detector has already scored every update as it arrived, but
+        # only since it started and only as far back as it still holds
+        if not self.anomaly_detector.covers(bounds[0]):
+            return await self._detect_anomalies(data)
+            
+        return {
+            **self.anomaly_detector.report(
+                since=bounds[0],
+                until=bounds[1],
+                sources=config.get('anomalySources', config.get('sources')),
+                project_ids=config.get('projectIds')
+            ),
+            "source": "stream"
         }
+
+    async def _generate_streaming_report(
+        self,
+        config: Dict
+    ) -> Dict:
+        """Generate summary, correlations and trends chunk by chunk.
+
+        Only one chunk is held in memory at a time; every statistic is
+        folded into a mergeable accumulator and finalized at the end.
+        """
+        summary = correlations = trends = None
+        rows = 0
+        chunks = 0
         
-        # Add feature importance
-        if data.shape[1] > 1:
-            insights["importance"] = await self._analyze_feature_importance(data)
+        async for chunk in self._iter_processed_chunks(config):
+            if summary is None:
+                columns = list(chunk.select_dtypes(include='number').columns)
+                summary = MomentsAccumulator(columns)
+                correlations = CorrelationStore(
+                    columns,
+                    freq=config.get('correlationBucket', self.correlation_bucket)
+                )
+                trends = TrendAccumulator(
+                    columns,
+                    freq=config.get('trendPeriod', 'M')
+                )
+                
+            summary.update(chunk)
+            correlations.update(chunk)
+            trends.update(chunk)
+            rows += len(chunk)
+            chunks += 1
+            
+        if summary is None:
+            return {
+                "summary": {},
+                "correlations": {},
+                "trends": {},
+                "rows": 0,
+                "chunks": 0
+            }
             
-        return insights
+        return {
+            "summary": summary.result(),
+            "correlations": correlations.correlation(
+                *self._correlation_window(config)
+            ),
+            "trends": trends.result(),
+            "rows": rows,
+            "chunks": chunks
+        }
+
+    async def _iter_processed_chunks(
+        self,
+        config: Dict
+    ) -> AsyncIterator[pd.DataFrame]:
+        """Fetch and process report data in bounded pages"""
+        chunk_size = config.get('chunkSize', self.chunk_size)
+        offset = 0
+        
+        while True:
+            raw_data = await self._fetch_data({
+                **config,
+                "offset": offset,
+                "limit": chunk_size
+            })
+            
+            # Processing can filter out a whole page, so only an empty raw
+            # page marks the end of the data
+            if self._page_rows(raw_data) == 0:
+                return
+                
+            chunk = self._process_data(raw_data, config)
+            if not chunk.empty:
+                yield chunk
+                
+            offset += chunk_size
+
+    def _page_rows(self, raw_data) -> int:
+        """Count the fetched rows of a page across its source tables"""
+        if isinstance(raw_data, dict):
+            return sum(len(rows) for rows in raw_data.values())
+            
+        return len(raw_data)
+
+    async def _reduce_dimensions(
+        self,
+        data: pd.DataFrame,
+        solver: str = 'auto'
+    ) -> np.ndarray:
+        """Scale data and reduce its dimensions, off the event loop"""
+        if solver == 'auto' and len(data) >= self.large_frame_rows:
+            solver = 'randomized'
+            
+        # Hashing reads every cell, so it stays off the event loop too
+        fingerprint = await asyncio.to_thread(self._fingerprint, data)
+        key = f"{fingerprint}:{self.n_components}:{solver}"
+        pipeline = self._pipelines.get(key)
+        
+        if pipeline is not None:
+            # Fitted pipelines are only read by transform, so concurrent
+            # reports can share them safely
+            self._pipelines.move_to_end(key)
+            return await asyncio.to_thread(pipeline.transform, data)
+            
+        # Fitting happens on a worker's own copy, never on shared estimators
+        pipeline, reduced = await compute_executor.run(
+            _fit_reduction,
+            data,
+            self.n_components,
+            solver
+        )
+        
+        self._pipelines[key] = pipeline
+        while len(self._pipelines) > self.max_cached_pipelines:
+            self._pipelines.popitem(last=False)
+            
+        return reduced
+
+    def _fingerprint(self, data: pd.DataFrame) -> str:
+        """Identify a dataset by its columns and contents"""
+        digest = hashlib.sha1()
+        digest.update(",".join(map(str, data.columns)).encode())
+        digest.update(
+            pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes()
+        )
+        
+        return digest.hexdigest()
 
     async def _perform_clustering(
         self,
-        data: pd.DataFrame
+        reduced_data: np.ndarray,
+        options: Optional[Dict] = None
     ) -> Dict:
         """Perform advanced clustering analysis"""
-        # Prepare data
-        scaled_data = self.scaler.fit_transform(data)
-        
-        # Reduce dimensions for visualization
-        reduced_data = self.pca.fit_transform(scaled_data)
+        options = options or {}
+        mode = options.get('mode', 'auto')
+        seed = options.get('seed', 0)
+        sample_size = None
         
+        if mode == 'auto':
+            mode = (
+                'minibatch'
+                if len(reduced_data) >= self.scalable_clustering_rows
+                else 'full'
+            )
+            
         # Perform clustering
-        clusters = await self.ml_engine.perform_clustering(reduced_data)
+        if mode == 'minibatch':
+            clusters = await compute_executor.run(
+                _minibatch_cluster,
+                reduced_data,
+                options.get('nClusters', 5),
+                options.get('batchSize', 4096),
+                seed
+            )
+            # Silhouette is quadratic, so score a stratified sample
+            sample_size = options.get('sampleSize', 10_000)
+        else:
+            clusters = await self.ml_engine.perform_clustering(reduced_data)
         
         # Analyze clusters
         cluster_analysis = {
             "centers": clusters.cluster_centers_,
             "labels": clusters.labels_,
-            "metrics": self._calculate_cluster_metrics(clusters, reduced_data)
+            "mode": mode,
+            "metrics": await self._calculate_cluster_metrics(
+                clusters,
+                reduced_data,
+                sample_size,
+                seed
+            )
         }
         
         return cluster_analysis
@@ -123,15 +703,24 @@ class AnalyticsService:
         
         return recommendations
 
-    def _calculate_cluster_metrics(
+    async def _calculate_cluster_metrics(
         self,
         clusters: any,
-        data: np.ndarray
+        data: np.ndarray,
+        sample_size: Optional[int] = None,
+        seed: int = 0
     ) -> Dict:
         """Calculate detailed cluster metrics"""
+        labels = clusters.labels_
+        
+        if sample_size is not None:
+            rows = _stratified_sample(labels, sample_size, seed)
+            data, labels = data[rows], labels[rows]
+            
+        scores = await compute_executor.run(_score_clusters, data, labels)
+        
         return {
-            "silhouette": silhouette_score(data, clusters.labels_),
-            "calinski": calinski_harabasz_score(data, clusters.labels_),
-            "davies": davies_bouldin_score(data, clusters.labels_),
-            "inertia": clusters.inertia_
+            **scores,
+            "inertia": clusters.inertia_,
+            "sampleSize": len(labels)
         }
\ No newline at end of file
@@ -0,0 +1,256 @@
+import math
+from collections import deque
+from datetime import datetime, timezone
+from typing import AsyncIterable, Callable, Dict, List, Optional, Union
+
+
+class SeriesState:
+    """Constant-size running statistics for one metric series"""
+
+    __slots__ = (
+        "count",
+        "mean",
+        "variance",
+        "median",
+        "mad",
+        "last_value",
+        "last_seen"
+    )
+
+    def __init__(self, value: float):
+        self.count = 1
+        self.mean = value
+        self.variance = 0.0
+        self.median = value
+        self.mad = 0.0
+        self.last_value = value
+        self.last_seen: Optional[datetime] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "ewma": self.mean,
+            "ewmStd": math.sqrt(self.variance),
+            "median": self.median,
+            "mad": self.mad,
+            "lastValue": self.last_value,
+            "lastSeen": self.last_seen
+        }
+
+
+class StreamingAnomalyDetector:
+    """Flag anomalies in Transaction, Risk and Progress updates as they arrive.
+
+    Every series keeps an EWMA mean and variance plus a streaming estimate
+    of its median and median absolute deviation. A value is anomalous when
+    its robust z-score exceeds `threshold` once the series has seen
+    `warmup` points.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.05,
+        threshold: float = 3.5,
+        warmup: int = 20,
+        max_recent: int = 1000,
+        on_anomaly: Optional[Callable[[Dict], None]] = None
+    ):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.on_anomaly = on_anomaly
+        self._series: Dict[str, SeriesState] = {}
+        self._recent = deque(maxlen=max_recent)
+        self._observing_since: Optional[datetime] = None
+        self._evicted_through: Optional[datetime] = None
+
+    def observe(
+        self,
+        series: str,
+        value: float,
+        timestamp: Optional[datetime] = None
+    ) -> Optional[Dict]:
+        """Fold one value into a series and return an anomaly, if any"""
+        value = float(value)
+        timestamp = to_naive_utc(timestamp) or datetime.utcnow()
+        state = self._series.get(series)
+
+        if self._observing_since is None:
+            self._observing_since = timestamp
+
+        if state is None:
+            state = self._series[series] = SeriesState(value)
+            state.last_seen = timestamp
+            return None
+
+        anomaly = None
+
+        # Score against the state before this value moves it
+        if state.count >= self.warmup:
+            anomaly = self._score(series, state, value, timestamp)
+
+        self._update(state, value)
+        state.last_seen = timestamp
+
+        if anomaly is not None:
+            # Remember how far back the buffer is no longer complete
+            if len(self._recent) == self._recent.maxlen:
+                evicted = self._recent[0]["timestamp"]
+                if (
+                    self._evicted_through is None
+                    or evicted > self._evicted_through
+                ):
+                    self._evicted_through = evicted
+            self._recent.append(anomaly)
+            if self.on_anomaly is not None:
+                self.on_anomaly(anomaly)
+
+        return anomaly
+
+    def observe_event(self, event: Dict) -> Optional[Dict]:
+        """Observe a change event published by a model hook.
+
+        Events look like {"source": "transactions", "projectId": ...,
+        "metric": "amount", "value": ..., "timestamp": ...}.
+        """
+        series = ":".join(
+            str(part) for part in (
+                event["source"],
+                event.get("projectId", "all"),
+                event.get("metric", "value")
+            )
+        )
+        return self.observe(series, event["value"], event.get("timestamp"))
+
+    async def consume(self, events: AsyncIterable[Dict]) -> None:
+        """Observe events from a stream until it ends"""
+        async for event in events:
+            self.observe_event(event)
+
+    def series_count(self) -> int:
+        """Get the number of tracked series"""
+        return len(self._series)
+
+    def covers(self, since: Optional[datetime]) -> bool:
+        """Check whether every anomaly after `since` is still retained"""
+        if since is None or self._observing_since is None:
+            return False
+
+        return since >= self._observing_since and (
+            self._evicted_through is None or since > self._evicted_through
+        )
+
+    def report(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sources: Optional[List[str]] = None,
+        project_ids: Optional[List[str]] = None
+    ) -> Dict:
+        """Get recent anomalies and current baselines for batch reports"""
+        projects = None if project_ids is None else set(map(str, project_ids))
+
+        def selected(series: str) -> bool:
+            parts = series.split(":")
+            return (
+                (sources is None or parts[0] in sources)
+                and (
+                    projects is None
+                    or (len(parts) > 1 and parts[1] in projects)
+                )
+            )
+
+        return {
+            "anomalies": [
+                anomaly for anomaly in self._recent
+                if selected(anomaly["series"])
+                and (since is None or anomaly["timestamp"] >= since)
+                and (until is None or anomaly["timestamp"] <= until)
+            ],
+            "baselines": {
+                series: state.to_dict()
+                for series, state in self._series.items()
+                if selected(series)
+            }
+        }
+
+    def _score(
+        self,
+        series: str,
+        state: SeriesState,
+        value: float,
+        timestamp: datetime
+    ) -> Optional[Dict]:
+        """Build an anomaly record when a value is far from its baseline"""
+        # 1.4826 * MAD estimates the standard deviation for normal data
+        robust_scale = 1.4826 * state.mad
+        std = math.sqrt(state.variance)
+
+        if robust_scale > 0:
+            robust_z = (value - state.median) / robust_scale
+        elif std > 0:
+            robust_z = (value - state.mean) / std
+        else:
+            robust_z = 0.0 if value == state.median else math.inf
+
+        if abs(robust_z) <= self.threshold:
+            return None
+
+        return {
+            "series": series,
+            "timestamp": timestamp,
+            "value": value,
+            "expected": state.median,
+            "robustZ": robust_z,
+            "ewmaZ": (value - state.mean) / std if std > 0 else None
+        }
+
+    def _update(
+        self,
+        state: SeriesState,
+        value: float
+    ) -> None:
+        """Move the running statistics toward a new value"""
+        delta = value - state.mean
+        state.mean += self.alpha * delta
+        state.variance = (1 - self.alpha) * (
+            state.variance + self.alpha * delta * delta
+        )
+
+        # Stochastic approximation of median and MAD, with a step that
+        # scales with the series so it works for any unit; half the EWMA
+        # rate keeps the estimates from chasing noise
+        step = 0.5 * self.alpha * max(math.sqrt(state.variance), state.mad, 1e-9)
+        state.median += step * _sign(value - state.median)
+        state.mad += step * _sign(abs(value - state.median) - state.mad)
+        state.mad = max(state.mad, 0.0)
+
+        state.last_value = value
+        state.count += 1
+
+
+def to_naive_utc(
+    value: Optional[Union[datetime, str]]
+) -> Optional[datetime]:
+    """Parse a datetime or ISO string into a naive UTC datetime"""
+    if not value:
+        return None
+
+    if isinstance(value, str):
+        # fromisoformat only accepts a trailing "Z" from Python 3.11
+        if value.endswith('Z'):
+            value = value[:-1] + '+00:00'
+        value = datetime.fromisoformat(value)
+
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return value
+
+
+def _sign(value: float) -> float:
+    return float(value > 0) - float(value < 0)
+
+
+# Fed by ChangeFeed from the Transaction, Risk and Progress change streams
+streaming_anomalies = StreamingAnomalyDetector()
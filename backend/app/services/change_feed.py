@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional
+from app.models import Progress, Project, Risk, Supplier, Transaction
+from app.services.anomaly_stream import (
+    StreamingAnomalyDetector,
+    streaming_anomalies
+)
+from app.services.dashboard_rollups import (
+    DashboardRollupStore,
+    dashboard_rollups
+)
+
+logger = logging.getLogger(__name__)
+
+# Source name -> model publishing its row changes. Every model's
+# `changes()` is an async iterator of {"op": "insert" | "update" | "delete",
+# "before": row or None, "after": row or None, "timestamp": datetime}.
+CHANGE_SOURCES = {
+    "transactions": Transaction,
+    "projects": Project,
+    "risks": Risk,
+    "suppliers": Supplier,
+    "progress": Progress
+}
+
+# Gauge metric -> whether a row counts towards it
+ROLLUP_GAUGES: Dict[str, Callable[[Dict], bool]] = {
+    "projects": lambda row: row.get("status") == 'active',
+    "risks": lambda row: (
+        row.get("severity") == 'critical' and row.get("status") != 'closed'
+    ),
+    "suppliers": lambda row: row.get("status") == 'active'
+}
+
+# Source -> numeric fields scored by the streaming anomaly detector
+ANOMALY_METRICS = {
+    "transactions": ("amount",),
+    "risks": ("likelihood", "cost_impact"),
+    "progress": ("progress",)
+}
+
+
+class ChangeFeed:
+    """Apply model row changes to the dashboard rollups and anomaly detector.
+
+    One consumer task runs per source. A consumer that stops may have
+    missed changes, so it invalidates the rollups to force a re-seed.
+    """
+
+    def __init__(
+        self,
+        sources: Optional[Dict[str, Any]] = None,
+        rollups: Optional[DashboardRollupStore] = None,
+        detector: Optional[StreamingAnomalyDetector] = None
+    ):
+        self.sources = sources or CHANGE_SOURCES
+        self.rollups = rollups or dashboard_rollups
+        self.detector = detector or streaming_anomalies
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self) -> None:
+        """Start a consumer per source, restarting any that stopped"""
+        for source, model in self.sources.items():
+            task = self._tasks.get(source)
+
+            if task is None or task.done():
+                self._tasks[source] = asyncio.ensure_future(
+                    self._consume(source, model)
+                )
+
+    async def stop(self) -> None:
+        """Cancel every consumer and wait for them to finish"""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def apply(self, source: str, change: Dict) -> None:
+        """Apply one row change to the rollups and the anomaly detector"""
+        before = change.get("before") or {}
+        after = change.get("after") or {}
+        at = change.get("timestamp")
+
+        if source == "transactions":
+            # Revenue belongs to the bucket of the transaction's own date
+            if before:
+                self.rollups.record_revenue(
+                    -float(before.get("amount") or 0),
+                    before.get("date") or at
+                )
+            if after:
+                self.rollups.record_revenue(
+                    float(after.get("amount") or 0),
+                    after.get("date") or at
+                )
+        elif source in ROLLUP_GAUGES:
+            counted = ROLLUP_GAUGES[source]
+            self.rollups.record_status_change(
+                source,
+                bool(before) and counted(before),
+                bool(after) and counted(after),
+                at
+            )
+
+        # Score only values that were written, not deletes or untouched fields
+        for metric in ANOMALY_METRICS.get(source, ()):
+            value = after.get(metric)
+
+            if value is not None and value != before.get(metric):
+                self.detector.observe_event({
+                    "source": source,
+                    "projectId": after.get(
+                        "project_id",
+                        after.get("projectId", "all")
+                    ),
+                    "metric": metric,
+                    "value": value,
+                    "timestamp": at
+                })
+
+    async def _consume(self, source: str, model: Any) -> None:
+        """Apply a source's changes until its stream ends"""
+        try:
+            async for change in model.changes():
+                try:
+                    self.apply(source, change)
+                except Exception:
+                    logger.exception("Failed to apply %s change", source)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Change stream for %s stopped", source)
+        finally:
+            self.rollups.invalidate()
+
+
+# Started by DashboardService and AnalyticsService on first use
+change_feed = ChangeFeed()
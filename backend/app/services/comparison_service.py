@@ -1,13 +1,43 @@
 // backend/app/services/comparison_service.py
-from typing import Dict, List
+from collections import OrderedDict
+from typing import Dict, List, Tuple
 import pandas as pd
 import numpy as np
 from app.models import Project, Metric
-from app.utils.statistics import StatisticalAnalysis
+from app.utils.fan_out import FanOutExecutor
+from app.utils.swr_cache import StaleWhileRevalidateCache
+from app.utils.project_matrix import (
+    COMPARISON_METRICS,
+    PROJECT_FIELDS,
+    VARIANCE_FIELDS,
+    ProjectMatrix,
+    column_summary,
+    describe_columns,
+    to_json_list
+)
 
 class ComparisonService:
-    def __init__(self):
-        self.stats = StatisticalAnalysis()
+    def __init__(
+        self,
+        significance_level: float = 0.05,
+        max_concurrency: int = 4,
+        section_timeout: float = 10.0,
+        benchmark_ttl: float = 3600.0,
+        benchmark_max_stale: float = 86400.0,
+        max_cached_projects: int = 10_000
+    ):
+        self.significance_level = significance_level
+        self.executor = FanOutExecutor(max_concurrency, section_timeout)
+        self.benchmark_cache = StaleWhileRevalidateCache(
+            benchmark_ttl,
+            benchmark_max_stale
+        )
+        self.max_cached_projects = max_cached_projects
+        # Project id -> (data version, matrix row, record)
+        self._projects: "OrderedDict[str, Tuple[str, np.ndarray, Dict]]" = (
+            OrderedDict()
+        )
+        self.project_stats = {"hits": 0, "loads": 0}
 
     async def compare_projects(
         self,
@@ -15,57 +45,210 @@ class ComparisonService:
     ) -> Dict:
         """Generate comprehensive project comparison"""
         projects = await self._get_projects_data(project_ids)
-        benchmarks = await self._get_industry_benchmarks(projects)
+        records = projects.records
+        
+        # Benchmarks usually come from the cache, so the sections overlap
+        # with nothing but each other
+        sections = await self.executor.run({
+            "benchmarks": lambda: self._get_industry_benchmarks(records),
+            "timeline": lambda: self._compare_timelines(records),
+            "costs": lambda: self._compare_costs(records),
+            "risks": lambda: self._compare_risks(records),
+            "performance": lambda: self._compare_performance(records)
+        })
+        benchmarks = sections["benchmarks"]["data"] or {}
         
         comparison = {
             "metrics": self._compare_metrics(projects, benchmarks),
-            "timeline": await self._compare_timelines(projects),
-            "costs": await self._compare_costs(projects),
-            "risks": await self._compare_risks(projects),
-            "performance": await self._compare_performance(projects),
+            **{
+                name: section["data"]
+                for name, section in sections.items()
+                if name != "benchmarks"
+            },
             "variance": self._analyze_variance(projects)
         }
+        comparison["meta"] = {
+            "partial": any(s["partial"] for s in sections.values()),
+            "sections": {
+                name: {
+                    "partial": section["partial"],
+                    "missing": section["missing"],
+                    "errors": section["errors"],
+                    "latencyMs": section["latencyMs"]
+                }
+                for name, section in sections.items()
+            }
+        }
         
         return comparison
 
-    async def _compare_metrics(
+    def cache_stats(self) -> Dict:
+        """Get counters for the benchmark and project caches"""
+        return {
+            "benchmarks": dict(self.benchmark_cache.stats),
+            "projects": {
+                **self.project_stats,
+                "size": len(self._projects)
+            }
+        }
+
+    def invalidate_benchmarks(self) -> None:
+        """Force the next comparison to reload industry benchmarks"""
+        self.benchmark_cache.invalidate()
+
+    async def _get_industry_benchmarks(
+        self,
+        projects: List[Dict]
+    ) -> Dict:
+        """Get benchmarks for the compared projects' industries"""
+        industries = tuple(sorted({
+            str(p.get("industry")) for p in projects if p.get("industry")
+        }))
+        
+        loaded = await self.benchmark_cache.get(
+            industries,
+            lambda: self._load_industry_benchmarks(industries)
+        )
+        
+        return loaded["benchmarks"]
+
+    async def _load_industry_benchmarks(
         self,
-        projects: List[Dict],
+        industries: Tuple[str, ...]
+    ) -> Dict:
+        """Reload benchmarks only when their published version changed"""
+        version = str(await Metric.benchmark_version(list(industries)))
+        
+        # The cached entry carries the version it was loaded at, so a
+        # revalidation can keep it without a second bookkeeping map
+        known = self.benchmark_cache.peek(industries)
+        if known is not None and known["version"] == version:
+            return known
+            
+        return {
+            "version": version,
+            "benchmarks": await Metric.industry_benchmarks(list(industries))
+        }
+
+    async def _get_projects_data(
+        self,
+        project_ids: List[str]
+    ) -> ProjectMatrix:
+        """Load the compared projects into one columnar matrix.
+
+        Rows are cached per project and data version, so a comparison that
+        adds or changes a few projects only loads those; statistics over
+        the set are then recomputed from the cached rows in one pass.
+        """
+        versions = {
+            str(pid): str(version)
+            for pid, version in (
+                await Project.data_versions(project_ids)
+            ).items()
+        }
+        stale = [
+            pid for pid in map(str, project_ids)
+            if pid not in versions
+            or pid not in self._projects
+            or self._projects[pid][0] != versions[pid]
+        ]
+        
+        if stale:
+            loaded = ProjectMatrix.from_records(
+                await Project.find_comparison_data(stale)
+            )
+            for pid in set(stale) - set(loaded.ids):
+                self._projects.pop(pid, None)
+            for i, pid in enumerate(loaded.ids):
+                self._projects[pid] = (
+                    versions.get(pid),
+                    loaded.values[i],
+                    loaded.records[i]
+                )
+                
+        self.project_stats["loads"] += len(stale)
+        self.project_stats["hits"] += len(project_ids) - len(stale)
+        
+        # Projects that no longer exist are left out of the comparison
+        ids = [pid for pid in map(str, project_ids) if pid in self._projects]
+        for pid in ids:
+            self._projects.move_to_end(pid)
+            
+        matrix = ProjectMatrix(
+            ids,
+            PROJECT_FIELDS,
+            np.array(
+                [self._projects[pid][1] for pid in ids],
+                dtype=np.float64
+            ).reshape(len(ids), len(PROJECT_FIELDS)),
+            [self._projects[pid][2] for pid in ids]
+        )
+        
+        # Evict only after assembling, so this comparison's rows survive
+        while len(self._projects) > self.max_cached_projects:
+            self._projects.popitem(last=False)
+            
+        return matrix
+
+    def _compare_metrics(
+        self,
+        projects: ProjectMatrix,
         benchmarks: Dict
     ) -> Dict:
         """Compare key metrics across projects"""
-        metrics = {}
-        
-        for metric in ['progress', 'costEfficiency', 'riskIndex']:
-            metrics[metric] = {
-                "values": [p[metric] for p in projects],
-                "benchmark": benchmarks[metric],
-                "analysis": self.stats.analyze_metric(
-                    [p[metric] for p in projects],
-                    benchmarks[metric]
-                )
+        values = projects.columns(COMPARISON_METRICS)
+        reference = np.array(
+            [benchmarks.get(metric, np.nan) for metric in COMPARISON_METRICS],
+            dtype=np.float64
+        )
+        
+        # One pass over the whole matrix covers every metric
+        described = describe_columns(values, reference, self.significance_level)
+        
+        return {
+            metric: {
+                "values": to_json_list(values[:, i]),
+                "benchmark": benchmarks.get(metric),
+                "analysis": column_summary(described, i)
             }
-            
-        return metrics
+            for i, metric in enumerate(COMPARISON_METRICS)
+        }
 
     def _analyze_variance(
         self,
-        projects: List[Dict]
+        projects: ProjectMatrix
     ) -> Dict:
         """Analyze variances between projects"""
-        variances = {
-            "schedule": self._analyze_schedule_variance(projects),
-            "cost": self._analyze_cost_variance(projects),
-            "quality": self._analyze_quality_variance(projects)
-        }
+        # Relative actual-vs-planned variances over the assumed
+        # VARIANCE_FIELDS schema; each result names the fields it used
+        variances = projects.variances()
+        kinds = list(variances)
         
-        # Calculate significance
-        for key in variances:
-            variances[key]["significance"] = self.stats.calculate_significance(
-                variances[key]["data"]
-            )
+        # Test every kind of variance against "on plan" at once
+        described = describe_columns(
+            np.column_stack([variances[kind] for kind in kinds]),
+            np.zeros(len(kinds)),
+            self.significance_level
+        )
+        
+        results = {}
+        for i, kind in enumerate(kinds):
+            summary = column_summary(described, i)
+            results[kind] = {
+                "data": to_json_list(variances[kind]),
+                "fields": dict(zip(
+                    ("actual", "planned"),
+                    VARIANCE_FIELDS[kind]
+                )),
+                "summary": summary,
+                "significance": {
+                    "tStat": summary["tStat"],
+                    "pValue": summary["pValue"],
+                    "significant": summary["significant"]
+                }
+            }
             
-        return variances
+        return results
 
 # backend/app/services/alert_service.py
 class SmartAlertService:
@@ -0,0 +1,209 @@
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+FLOW_METRICS = ('revenue',)
+GAUGE_METRICS = ('projects', 'risks', 'suppliers')
+
+class DashboardRollupStore:
+    """Per-day/week/month buckets for the metrics DashboardService reads.
+
+    Revenue is a flow: each bucket holds the sum recorded inside it.
+    Project, risk and supplier counts are gauges: the store keeps the live
+    value plus the value each bucket opened with, so the close of the
+    previous bucket is always one lookup away.
+
+    The change feed records every row change as it happens, so the store
+    only needs seeding once, and again whenever a feed consumer stops.
+    """
+
+    RETENTION = {
+        'day': 62,
+        'week': 26,
+        'month': 24
+    }
+
+    def __init__(self):
+        self._sums = defaultdict(dict)
+        self._openings = defaultdict(dict)
+        self._gauges: Dict[str, float] = {}
+        self.seeded_at: Optional[datetime] = None
+
+    def bucket_start(
+        self,
+        period: str,
+        at: Optional[datetime] = None
+    ) -> datetime:
+        """Get the start of the bucket containing `at`"""
+        day = (at or datetime.utcnow()).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+
+        if period == 'day':
+            return day
+        if period == 'week':
+            return day - timedelta(days=day.weekday())
+        if period == 'month':
+            return day.replace(day=1)
+
+        raise ValueError(f"Unsupported rollup period: {period}")
+
+    def needs_seed(
+        self,
+        max_age: Optional[float] = None,
+        at: Optional[datetime] = None
+    ) -> bool:
+        """Check whether the seeded values are missing or older than max_age"""
+        if self.seeded_at is None:
+            return True
+        if max_age is None:
+            return False
+
+        at = at or datetime.utcnow()
+        return (at - self.seeded_at).total_seconds() > max_age
+
+    def mark_seeded(self, at: Optional[datetime] = None) -> None:
+        """Record that every metric was just seeded from raw rows"""
+        self.seeded_at = at or datetime.utcnow()
+
+    def invalidate(self) -> None:
+        """Force a re-seed, e.g. after changes may have been missed"""
+        self.seeded_at = None
+
+    def previous_bucket_start(
+        self,
+        period: str,
+        at: Optional[datetime] = None
+    ) -> datetime:
+        """Get the start of the bucket before the one containing `at`"""
+        start = self.bucket_start(period, at)
+        return self.bucket_start(period, start - timedelta(days=1))
+
+    def record_revenue(
+        self,
+        amount: float,
+        at: Optional[datetime] = None
+    ) -> None:
+        """Add a transaction amount to every bucket containing `at`"""
+        for period in self.RETENTION:
+            buckets = self._bucket(self._sums, period, 'revenue', at)
+            start = self.bucket_start(period, at)
+            buckets[start] = buckets.get(start, 0) + amount
+
+    def record_change(
+        self,
+        metric: str,
+        delta: float,
+        at: Optional[datetime] = None
+    ) -> None:
+        """Apply a change to a gauge such as active projects"""
+        if metric not in GAUGE_METRICS:
+            raise ValueError(f"Unknown gauge metric: {metric}")
+
+        value = self._gauges.get(metric, 0)
+
+        # The first change in a bucket pins the value it opened with
+        for period in self.RETENTION:
+            buckets = self._bucket(self._openings, period, metric, at)
+            buckets.setdefault(self.bucket_start(period, at), value)
+
+        self._gauges[metric] = value + delta
+
+    def record_status_change(
+        self,
+        metric: str,
+        was_counted: bool,
+        is_counted: bool,
+        at: Optional[datetime] = None
+    ) -> None:
+        """Update a gauge when an entity enters or leaves the counted state"""
+        if was_counted != is_counted:
+            self.record_change(metric, 1 if is_counted else -1, at)
+
+    def seed(
+        self,
+        metric: str,
+        current: float,
+        previous: float,
+        period: str = 'month',
+        at: Optional[datetime] = None
+    ) -> None:
+        """Seed a metric from a one-off scan of the raw rows"""
+        start = self.bucket_start(period, at)
+
+        if metric in FLOW_METRICS:
+            buckets = self._bucket(self._sums, period, metric, at)
+            buckets[self.previous_bucket_start(period, at)] = previous
+            buckets[start] = current
+        else:
+            self._gauges[metric] = current
+            self._bucket(self._openings, period, metric, at)[start] = previous
+
+    def current(
+        self,
+        metric: str,
+        period: str,
+        at: Optional[datetime] = None
+    ) -> float:
+        """Get the value of a metric for the bucket containing `at`"""
+        return self.windows([metric], period, at)[metric][0]
+
+    def previous(
+        self,
+        metric: str,
+        period: str,
+        at: Optional[datetime] = None
+    ) -> float:
+        """Get the value of a metric for the bucket before `at`"""
+        return self.windows([metric], period, at)[metric][1]
+
+    def windows(
+        self,
+        metrics: List[str],
+        period: str,
+        at: Optional[datetime] = None
+    ) -> Dict[str, Tuple[float, float]]:
+        """Get current and previous bucket values for several metrics"""
+        start = self.bucket_start(period, at)
+        previous_start = self.previous_bucket_start(period, at)
+        windows = {}
+
+        for metric in metrics:
+            if metric in FLOW_METRICS:
+                sums = self._sums[(period, metric)]
+                windows[metric] = (
+                    sums.get(start, 0),
+                    sums.get(previous_start, 0)
+                )
+            else:
+                # The previous bucket closed with whatever this one opened with
+                current = self._gauges.get(metric, 0)
+                opening = self._openings[(period, metric)].get(start)
+                windows[metric] = (
+                    current,
+                    current if opening is None else opening
+                )
+
+        return windows
+
+    def _bucket(
+        self,
+        store: Dict,
+        period: str,
+        metric: str,
+        at: Optional[datetime]
+    ) -> Dict:
+        """Get the buckets of a metric, dropping those past retention"""
+        buckets = store[(period, metric)]
+        start = self.bucket_start(period, at)
+
+        # Late events can open old buckets, so evict by date, not insertion
+        if start not in buckets:
+            while len(buckets) >= self.RETENTION[period]:
+                del buckets[min(buckets)]
+
+        return buckets
+
+
+# Shared by every DashboardService in the process
+dashboard_rollups = DashboardRollupStore()
\ No newline at end of file
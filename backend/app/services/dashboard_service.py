@@ -1,76 +1,246 @@
-from typing import Dict, List
+import asyncio
+import json
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from app.models import Project, Risk, Supplier, Transaction
+from app.models import Transaction
 from app.utils.analytics import AnalyticsEngine
+from app.utils.fan_out import FanOutExecutor
+from app.utils.swr_cache import StaleWhileRevalidateCache
+from app.services.change_feed import ChangeFeed, change_feed
+from app.services.dashboard_rollups import DashboardRollupStore
+
+TREND_METRICS = {
+    "projectTrend": 'projects',
+    "riskTrend": 'risks',
+    "supplierTrend": 'suppliers',
+    "revenueTrend": 'revenue'
+}
 
 class DashboardService:
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        section_timeout: float = 5.0,
+        feed: Optional[ChangeFeed] = None,
+        cache_ttl: float = 30.0,
+        cache_max_stale: float = 300.0,
+        cache_max_entries: int = 1024,
+        rollup_max_age: Optional[float] = None,
+        seed_timeout: float = 30.0
+    ):
         self.analytics = AnalyticsEngine()
+        self.executor = FanOutExecutor(max_concurrency, section_timeout)
+        self.feed = feed or change_feed
+        self.rollups: DashboardRollupStore = self.feed.rollups
+        self.rollup_max_age = rollup_max_age
+        self.seed_timeout = seed_timeout
+        self._warm_lock = asyncio.Lock()
+        self.cache = StaleWhileRevalidateCache(
+            cache_ttl,
+            cache_max_stale,
+            cache_max_entries
+        )
 
     async def get_dashboard_metrics(
         self,
         filters: Dict
     ) -> Dict:
         """Get comprehensive dashboard metrics"""
-        period = filters.get('period', 'month')
+        filters = self._normalize_filters(filters)
+        
+        # Identical concurrent polls share one computation
+        return await self.cache.get(
+            json.dumps(filters, sort_keys=True, default=str),
+            lambda: self._compute_dashboard_metrics(filters)
+        )
+
+    def cache_stats(self) -> Dict:
+        """Get hit/miss/refresh counters for the metrics cache"""
+        return dict(self.cache.stats)
+
+    def _normalize_filters(self, filters: Dict) -> Dict:
+        """Normalize filters so equivalent requests share a cache key"""
+        normalized = {
+            key: value.strip().lower() if isinstance(value, str) else value
+            for key, value in (filters or {}).items()
+            if value is not None
+        }
+        normalized.setdefault('period', 'month')
+        
+        return normalized
+
+    async def _compute_dashboard_metrics(
+        self,
+        filters: Dict
+    ) -> Dict:
+        """Compute dashboard metrics without the cache"""
+        period = filters['period']
         start_date = self._get_period_start(period)
         
+        # Start the feed before seeding so no change between the two is lost
+        self.feed.start()
+        seeding = await self._ensure_rollups()
+        
+        # Fan out every independent query, then fan the results back in
+        sections = await self.executor.run({
+            "overview": lambda: self._get_overview_metrics(period),
+            "trends": lambda: self._get_trend_metrics(period),
+            "risks": lambda: self._get_risk_metrics(start_date),
+            "financial": lambda: self._get_financial_metrics(start_date),
+            "actions": self._get_critical_actions
+        })
+        
         metrics = {
-            "overview": await self._get_overview_metrics(start_date),
-            "trends": await self._get_trend_metrics(start_date),
-            "risks": await self._get_risk_metrics(start_date),
-            "financial": await self._get_financial_metrics(start_date),
-            "actions": await self._get_critical_actions()
+            name: section["data"] for name, section in sections.items()
+        }
+        metrics["meta"] = {
+            "partial": any(s["partial"] for s in sections.values()) or bool(
+                seeding and seeding["partial"]
+            ),
+            "rollups": seeding,
+            "sections": {
+                name: {
+                    "partial": section["partial"],
+                    "missing": section["missing"],
+                    "errors": section["errors"],
+                    "latencyMs": section["latencyMs"]
+                }
+                for name, section in sections.items()
+            }
         }
         
         return metrics
 
     async def _get_overview_metrics(
         self,
-        start_date: datetime
+        period: str
     ) -> Dict:
-        """Get overview metrics"""
+        """Get overview metrics from the rollup buckets"""
         return {
-            "activeProjects": await Project.count_active(),
-            "criticalRisks": await Risk.count_critical(),
-            "activeSuppliers": await Supplier.count_active(),
-            "revenue": await Transaction.sum_revenue(start_date)
+            "activeProjects": self.rollups.current('projects', period),
+            "criticalRisks": self.rollups.current('risks', period),
+            "activeSuppliers": self.rollups.current('suppliers', period),
+            "revenue": self.rollups.current('revenue', period)
         }
 
     async def _get_trend_metrics(
         self,
-        start_date: datetime
+        period: str
     ) -> Dict:
         """Calculate trend metrics"""
+        trends = self._calculate_trends(list(TREND_METRICS.values()), period)
+        
         return {
-            "projectTrend": await self._calculate_trend(
-                'projects',
-                start_date
-            ),
-            "riskTrend": await self._calculate_trend(
-                'risks',
-                start_date
-            ),
-            "supplierTrend": await self._calculate_trend(
-                'suppliers',
-                start_date
-            ),
-            "revenueTrend": await self._calculate_trend(
-                'revenue',
-                start_date
-            )
+            key: trends[metric_type]
+            for key, metric_type in TREND_METRICS.items()
         }
 
-    async def _calculate_trend(
+    def _calculate_trends(
+        self,
+        metric_types: List[str],
+        period: str
+    ) -> Dict[str, float]:
+        """Calculate trend percentages for several metrics in one pass"""
+        trends = {}
+        
+        for metric_type, (current, previous) in self.rollups.windows(
+            metric_types,
+            period
+        ).items():
+            if not previous:
+                trends[metric_type] = 0
+            else:
+                trends[metric_type] = ((current - previous) / previous) * 100
+                
+        return trends
+
+    def _calculate_trend(
         self,
         metric_type: str,
-        start_date: datetime
+        period: str
     ) -> float:
         """Calculate trend percentage for a metric"""
-        current = await self._get_current_value(metric_type)
-        previous = await self._get_previous_value(metric_type, start_date)
+        return self._calculate_trends([metric_type], period)[metric_type]
+
+    def _get_period_start(self, period: str) -> datetime:
+        """Get the start of the rollup bucket for a period"""
+        return self.rollups.bucket_start(period)
+
+    async def _ensure_rollups(self) -> Optional[Dict]:
+        """Seed the rollup buckets from raw rows if they are not seeded yet"""
+        if not self.rollups.needs_seed(self.rollup_max_age):
+            return None
+            
+        async with self._warm_lock:
+            if not self.rollups.needs_seed(self.rollup_max_age):
+                return None
+                
+            periods = list(self.rollups.RETENTION)
+            metric_types = list(TREND_METRICS.values())
+            
+            # Seeding shares the executor's concurrency limit and timeouts
+            sections = await self.executor.run(
+                {
+                    period: self._trend_window_queries(
+                        metric_types,
+                        self._get_period_start(period)
+                    )
+                    for period in periods
+                },
+                {period: self.seed_timeout for period in periods}
+            )
+            
+            for period, section in sections.items():
+                values = section["data"]
+                
+                for metric_type in metric_types:
+                    current = values[f"{metric_type}:current"]
+                    previous = values[f"{metric_type}:previous"]
+                    
+                    if current is not None and previous is not None:
+                        self.rollups.seed(metric_type, current, previous, period)
+            
+            partial = any(s["partial"] for s in sections.values())
+            
+            # Anything missing is retried by the next request
+            if not partial:
+                self.rollups.mark_seeded()
+                
+            return {
+                "seeded": True,
+                "partial": partial,
+                "missing": {
+                    period: section["missing"] + list(section["errors"])
+                    for period, section in sections.items()
+                    if section["partial"]
+                }
+            }
+
+    def _trend_window_queries(
+        self,
+        metric_types: List[str],
+        start_date: datetime
+    ) -> Dict:
+        """Build the current and previous raw value queries for metrics"""
+        queries = {}
         
-        if not previous:
-            return 0
+        for metric_type in metric_types:
+            queries[f"{metric_type}:current"] = (
+                lambda m=metric_type: self._get_window_value(m, start_date)
+            )
+            queries[f"{metric_type}:previous"] = (
+                lambda m=metric_type: self._get_previous_value(m, start_date)
+            )
+            
+        return queries
+
+    async def _get_window_value(
+        self,
+        metric_type: str,
+        start_date: datetime
+    ) -> float:
+        """Get the raw value of a metric for the window from start_date"""
+        if metric_type == 'revenue':
+            return await Transaction.sum_revenue(start_date)
             
-        return ((current - previous) / previous) * 100
\ No newline at end of file
+        return await self._get_current_value(metric_type)
\ No newline at end of file
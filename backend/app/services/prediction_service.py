@@ -1,16 +1,105 @@
 // backend/app/services/prediction_service.py
-from typing import Dict, List
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncIterator, Awaitable, Dict, List, Optional, Set, Tuple
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import GradientBoostingRegressor
 from prophet import Prophet
+from prophet.serialize import model_to_json, model_from_json
+from app.models import Progress
 from app.utils.time_series import TimeSeriesAnalysis
+from app.utils.compute_pool import compute_executor
+from app.utils.prophet_cache import ProphetModelCache
+from app.utils.monte_carlo import simulate_percentile_bands
+
+logger = logging.getLogger(__name__)
+
+# z-score of Prophet's default 80% uncertainty interval
+POOLED_INTERVAL_Z = 1.2816
+
+def _fit_prophet(
+    history: pd.DataFrame,
+    metric: str
+) -> str:
+    """Fit Prophet on one metric (runs in a compute worker)"""
+    model = Prophet()
+    model.fit(
+        history[['date', metric]].rename(columns={'date': 'ds', metric: 'y'})
+    )
+    return model_to_json(model)
+
+def _forecast_prophet(
+    model_json: str,
+    horizon: int
+) -> Dict:
+    """Forecast with a fitted Prophet model (runs in a compute worker)"""
+    model = model_from_json(model_json)
+    forecast = model.predict(model.make_future_dataframe(periods=horizon))
+    
+    return {
+        "forecast": forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']],
+        "changepoints": model.changepoints,
+        "trend": forecast['trend'].values
+    }
+
+def _pooled_progress_forecast(
+    training: List[np.ndarray],
+    targets: List[np.ndarray],
+    lags: int,
+    horizon: int
+) -> Tuple[np.ndarray, float]:
+    """Fit one progress model across projects and roll it forward for
+    `targets` in lockstep (runs in a compute worker). Also returns the
+    residual spread of a single increment."""
+    windows = []
+    labels = []
+    
+    for values in training:
+        increments = np.diff(values)
+        if len(increments) <= lags:
+            continue
+        windows.append(
+            np.lib.stride_tricks.sliding_window_view(increments, lags)[:-1]
+        )
+        labels.append(increments[lags:])
+        
+    features = np.vstack(windows)
+    labels = np.concatenate(labels)
+    model = GradientBoostingRegressor()
+    model.fit(features, labels)
+    spread = float(np.std(labels - model.predict(features)))
+    
+    # Short histories are left-padded with flat increments
+    recent = np.vstack([
+        np.pad(np.diff(values)[-lags:], (lags - min(lags, len(values) - 1), 0))
+        for values in targets
+    ])
+    last = np.array([values[-1] for values in targets], dtype=np.float64)
+    paths = np.empty((len(targets), horizon))
+    
+    for step in range(horizon):
+        increments = model.predict(recent)
+        last = last + increments
+        paths[:, step] = last
+        recent = np.hstack([recent[:, 1:], increments[:, None]])
+        
+    return paths, spread
 
 class PredictionService:
-    def __init__(self):
+    def __init__(
+        self,
+        prophet_cache: Optional[ProphetModelCache] = None,
+        min_history_rows: int = 30,
+        pooled_lags: int = 7
+    ):
         self.ts_analysis = TimeSeriesAnalysis()
         self.ml_model = GradientBoostingRegressor()
-        self.prophet_model = Prophet()
+        self.prophet_cache = prophet_cache or ProphetModelCache()
+        self.min_history_rows = min_history_rows
+        self.pooled_lags = pooled_lags
 
     async def generate_predictions(
         self,
@@ -21,12 +110,127 @@ class PredictionService:
         # Get historical data
         history = await self._get_project_history(project_id)
         
-        # Generate predictions for different aspects
+        return await self._generate_from_history(project_id, history, config)
+
+    async def generate_bulk_predictions(
+        self,
+        project_ids: List[str],
+        config: Dict,
+        checkpoint_path: Optional[str] = None,
+        max_concurrency: int = 4
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """Stream predictions for many projects as each one completes.
+
+        Histories are loaded in a single pass. Projects with too little
+        history for their own Prophet fit share one pooled progress model.
+        A project is appended to `checkpoint_path` once the consumer has
+        taken its result, and skipped on the next run, so an interrupted
+        batch resumes where it stopped without losing results. The file is
+        removed once a run finishes with every project succeeded.
+        """
+        completed = self._read_checkpoint(checkpoint_path)
+        project_ids = [p for p in project_ids if p not in completed]
+        
+        if not project_ids:
+            self._clear_checkpoint(checkpoint_path)
+            return
+            
+        histories = await self._get_project_histories(project_ids)
+        
+        # Without the pooled model each project falls back to its own fit,
+        # and failures are then reported per project
+        pooled_error = None
+        try:
+            pooled = await self._pooled_progress_forecasts(histories, config)
+        except Exception as e:
+            logger.exception("Pooled progress forecast failed")
+            pooled = {}
+            pooled_error = str(e)
+            
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run(project_id: str) -> Tuple[str, Dict, bool]:
+            async with semaphore:
+                try:
+                    predictions = await self._generate_from_history(
+                        project_id,
+                        histories[project_id],
+                        config,
+                        pooled.get(project_id)
+                    )
+                    if pooled_error is not None:
+                        predictions["metadata"]["pooledError"] = pooled_error
+                    return project_id, predictions, True
+                except Exception as e:
+                    return project_id, {"error": str(e)}, False
+                    
+        tasks = [asyncio.ensure_future(run(p)) for p in project_ids]
+        failed = False
+        
+        try:
+            for finished in asyncio.as_completed(tasks):
+                project_id, predictions, succeeded = await finished
+                
+                yield project_id, predictions
+                
+                # Only checkpoint once the consumer asked for the next item;
+                # failed projects stay out of it to be retried
+                if succeeded:
+                    self._write_checkpoint(checkpoint_path, project_id)
+                else:
+                    failed = True
+                    
+            # A complete run leaves nothing to resume
+            if not failed:
+                self._clear_checkpoint(checkpoint_path)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _generate_from_history(
+        self,
+        project_id: str,
+        history: pd.DataFrame,
+        config: Dict,
+        pooled_progress: Optional[Dict] = None
+    ) -> Dict:
+        """Generate predictions from an already loaded history"""
+        # Every forecast reads the same history frame and none of them
+        # modify it, so they share it instead of working on copies
+        timings = {}
+        progress, costs, risks, scenarios = await asyncio.gather(
+            self._timed(
+                'progress',
+                self._predict_progress(
+                    project_id,
+                    history,
+                    config,
+                    pooled_progress
+                ),
+                timings
+            ),
+            self._timed(
+                'costs',
+                self._in_thread(self._predict_costs, history, config),
+                timings
+            ),
+            self._timed(
+                'risks',
+                self._in_thread(self._predict_risks, history, config),
+                timings
+            ),
+            self._timed(
+                'scenarios',
+                self._generate_scenarios(history, config, timings),
+                timings
+            )
+        )
+        
         predictions = {
-            "progress": await self._predict_progress(history, config),
-            "costs": await self._predict_costs(history, config),
-            "risks": await self._predict_risks(history, config),
-            "scenarios": await self._generate_scenarios(history, config)
+            "progress": progress,
+            "costs": costs,
+            "risks": risks,
+            "scenarios": scenarios
         }
         
         # Add confidence intervals
@@ -34,48 +238,263 @@ class PredictionService:
             predictions,
             config["confidenceInterval"]
         )
+        predictions["metadata"] = {"timingsMs": timings}
         
         return predictions
 
+    async def _in_thread(self, forecast, *args):
+        """Run a CPU-bound forecast coroutine on a worker thread.
+
+        The cost and risk models fit in memory without awaiting any I/O, so
+        each runs to completion on its own event loop in the thread instead
+        of blocking this one.
+        """
+        return await asyncio.to_thread(asyncio.run, forecast(*args))
+
+    async def _timed(
+        self,
+        name: str,
+        awaitable: Awaitable,
+        timings: Dict[str, float]
+    ):
+        """Await a forecast and record how long it took"""
+        started = time.perf_counter()
+        
+        try:
+            return await awaitable
+        finally:
+            timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
     async def _predict_progress(
         self,
+        project_id: str,
         history: pd.DataFrame,
-        config: Dict
+        config: Dict,
+        pooled_progress: Optional[Dict] = None
     ) -> Dict:
         """Predict project progress"""
-        model = self._prepare_prophet_model(history, 'progress')
-        future = model.make_future_dataframe(periods=config['horizon'])
-        forecast = model.predict(future)
+        if pooled_progress is not None:
+            return pooled_progress
+            
+        model_json = await self._prepare_prophet_model(
+            project_id,
+            history,
+            'progress'
+        )
         
-        return {
-            "forecast": forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']],
-            "changepoints": model.changepoints,
-            "trend": forecast['trend'].values
+        return await compute_executor.run(
+            _forecast_prophet,
+            model_json,
+            config['horizon']
+        )
+
+    async def _pooled_progress_forecasts(
+        self,
+        histories: Dict[str, pd.DataFrame],
+        config: Dict
+    ) -> Dict[str, Dict]:
+        """Forecast progress of short-history projects with one pooled model"""
+        short = [
+            project_id for project_id, history in histories.items()
+            if 0 < len(history) < self.min_history_rows
+        ]
+        training = [
+            history['progress'].to_numpy(dtype=np.float64)
+            for history in histories.values()
+            if len(history) > self.pooled_lags + 1
+        ]
+        
+        if not short or not training:
+            return {}
+            
+        paths, spread = await compute_executor.run(
+            _pooled_progress_forecast,
+            training,
+            [
+                histories[p]['progress'].to_numpy(dtype=np.float64)
+                for p in short
+            ],
+            self.pooled_lags,
+            config['horizon']
+        )
+        
+        forecasts = {}
+        
+        for project_id, path in zip(short, paths):
+            dates = pd.date_range(
+                histories[project_id]['date'].max(),
+                periods=config['horizon'] + 1,
+                freq='D'
+            )[1:]
+            
+            # Increment errors add up along the path, so the band widens
+            # with the square root of the step, like a random walk
+            width = POOLED_INTERVAL_Z * spread * np.sqrt(
+                np.arange(1, len(path) + 1)
+            )
+            
+            # Same keys as a Prophet forecast; the pooled model has no
+            # changepoints and no seasonality, so its trend is the path
+            forecasts[project_id] = {
+                "forecast": pd.DataFrame({
+                    "ds": dates,
+                    "yhat": path,
+                    "yhat_lower": path - width,
+                    "yhat_upper": path + width
+                }),
+                "changepoints": pd.Series([], dtype='datetime64[ns]'),
+                "trend": path,
+                "model": "pooled"
+            }
+            
+        return forecasts
+
+    async def _get_project_histories(
+        self,
+        project_ids: List[str]
+    ) -> Dict[str, pd.DataFrame]:
+        """Load histories for many projects in a single query"""
+        frame = await Progress.history_frame(project_ids)
+        histories = {
+            project_id: frame.iloc[0:0] for project_id in project_ids
         }
+        
+        for project_id, group in frame.groupby('project_id'):
+            histories[project_id] = group.drop(
+                columns='project_id'
+            ).sort_values('date').reset_index(drop=True)
+            
+        return histories
+
+    def _read_checkpoint(self, path: Optional[str]) -> Set[str]:
+        """Get project ids a previous bulk run already finished"""
+        if not path or not os.path.exists(path):
+            return set()
+            
+        with open(path) as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def _write_checkpoint(
+        self,
+        path: Optional[str],
+        project_id: str
+    ) -> None:
+        """Record a finished project of a bulk run"""
+        if not path:
+            return
+            
+        with open(path, 'a') as f:
+            f.write(f"{project_id}\n")
+
+    def _clear_checkpoint(self, path: Optional[str]) -> None:
+        """Remove the checkpoint of a finished bulk run"""
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    async def _prepare_prophet_model(
+        self,
+        project_id: str,
+        history: pd.DataFrame,
+        metric: str
+    ) -> str:
+        """Get a fitted Prophet model, refitting only when history changed"""
+        version = self._history_version(history, metric)
+        model_json = await self.prophet_cache.get(project_id, metric, version)
+        
+        if model_json is None:
+            model_json = await compute_executor.run(
+                _fit_prophet,
+                history,
+                metric
+            )
+            await self.prophet_cache.put(
+                project_id,
+                metric,
+                version,
+                model_json
+            )
+            
+        return model_json
+
+    def _history_version(
+        self,
+        history: pd.DataFrame,
+        metric: str
+    ) -> str:
+        """Identify the history rows a model would be fitted on"""
+        rows = history[['date', metric]].dropna()
+        
+        if rows.empty:
+            return "0"
+            
+        return f"{len(rows)}:{rows['date'].max()}:{rows[metric].iloc[-1]}"
 
     async def _generate_scenarios(
         self,
         history: pd.DataFrame,
-        config: Dict
+        config: Dict,
+        timings: Optional[Dict[str, float]] = None
     ) -> Dict:
         """Generate different scenarios"""
-        scenarios = {}
+        if config.get('scenarioMode') == 'monteCarlo':
+            return await self._generate_monte_carlo_scenarios(history, config)
+            
+        timings = {} if timings is None else timings
+        generators = []
         
         for scenario in config['scenarios']:
             if scenario == 'optimistic':
-                scenarios[scenario] = self._generate_optimistic_scenario(
-                    history,
-                    config
-                )
+                generator = self._generate_optimistic_scenario
             elif scenario == 'pessimistic':
-                scenarios[scenario] = self._generate_pessimistic_scenario(
-                    history,
-                    config
-                )
+                generator = self._generate_pessimistic_scenario
             else:
-                scenarios[scenario] = self._generate_realistic_scenario(
-                    history,
-                    config
-                )
+                generator = self._generate_realistic_scenario
                 
+            generators.append((scenario, generator))
+            
+        # Scenario generators are synchronous, so each runs on a worker thread
+        results = await asyncio.gather(*[
+            self._timed(
+                f"scenarios.{scenario}",
+                asyncio.to_thread(generator, history, config),
+                timings
+            )
+            for scenario, generator in generators
+        ])
+        
+        return {
+            scenario: result
+            for (scenario, _), result in zip(generators, results)
+        }
+
+    async def _generate_monte_carlo_scenarios(
+        self,
+        history: pd.DataFrame,
+        config: Dict
+    ) -> Dict:
+        """Generate P10/P50/P90 bands from sampled progress and cost paths"""
+        options = config.get('monteCarlo', {})
+        metrics = [m for m in ('progress', 'cost') if m in history.columns]
+        
+        upper_bounds = {}
+        if 'progress' in metrics:
+            # Progress is tracked either as a fraction or as a percentage
+            upper_bounds['progress'] = (
+                100.0 if history['progress'].max() > 1 else 1.0
+            )
+            
+        scenarios = await compute_executor.run(
+            simulate_percentile_bands,
+            {metric: history[metric].to_numpy() for metric in metrics},
+            config['horizon'],
+            paths=options.get('paths', 5000),
+            seed=options.get('seed', 0),
+            upper_bounds=upper_bounds
+        )
+        scenarios["dates"] = pd.date_range(
+            history['date'].max(),
+            periods=config['horizon'] + 1,
+            freq='D'
+        )[1:]
+        
         return scenarios
\ No newline at end of file
@@ -1,13 +1,25 @@
 
 // backend/app/services/risk_management.py
-from typing import Dict, List
+import asyncio
+from typing import Awaitable, Dict, List, Optional
 from datetime import datetime
 from app.models import Project, Risk, Mitigation
 from app.utils.risk_analysis import RiskAnalyzer
+from app.utils.risk_scoring import VectorizedRiskScorer
+from app.utils.fan_out import FanOutExecutor
 
 class RiskManagementService:
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        identification_timeout: float = 10.0,
+        category_timeouts: Optional[Dict[str, float]] = None
+    ):
         self.analyzer = RiskAnalyzer()
+        self.scorer = VectorizedRiskScorer()
+        self.max_concurrency = max_concurrency
+        self.identifier = FanOutExecutor(4, identification_timeout)
+        self.category_timeouts = category_timeouts or {}
 
     async def analyze_project_risks(
         self,
@@ -17,7 +29,8 @@ class RiskManagementService:
         project = await Project.get(project_id)
         
         # Identify risks
-        identified_risks = await self._identify_risks(project)
+        identification = await self._identify_risks(project)
+        identified_risks = identification["risks"]
         
         # Assess risks
         assessed_risks = await self._assess_risks(identified_risks)
@@ -31,64 +44,124 @@ class RiskManagementService:
         return {
             "risks": assessed_risks,
             "mitigations": mitigations,
-            "metrics": metrics
+            "metrics": metrics,
+            "identification": identification["categories"]
         }
 
+    async def assess_portfolio_risks(
+        self,
+        project_ids: List[str]
+    ) -> Dict[str, List[Dict]]:
+        """Re-assess identified risks for many projects in one scoring pass"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        projects = await asyncio.gather(*[
+            self._bounded(semaphore, Project.get(project_id))
+            for project_id in project_ids
+        ])
+        identified = await asyncio.gather(*[
+            self._bounded(semaphore, self._identify_risks(project))
+            for project in projects
+        ])
+        
+        return self.scorer.score_many({
+            project_id: identification["risks"]
+            for project_id, identification in zip(project_ids, identified)
+        })
+
     async def _identify_risks(
         self,
         project: Project
-    ) -> List[Dict]:
+    ) -> Dict:
         """Identify potential project risks"""
-        risks = []
+        # Categories hit different data, so they run side by side
+        sections = await self.identifier.run(
+            {
+                "technical": lambda: self._identify_technical_risks(project),
+                "supply": lambda: self._identify_supply_risks(project),
+                "financial": lambda: self._identify_financial_risks(project),
+                "timeline": lambda: self._identify_timeline_risks(project)
+            },
+            self.category_timeouts
+        )
         
-        # Technical risks
-        risks.extend(await self._identify_technical_risks(project))
-        
-        # Supply chain risks
-        risks.extend(await self._identify_supply_risks(project))
-        
-        # Financial risks
-        risks.extend(await self._identify_financial_risks(project))
-        
-        # Timeline risks
-        risks.extend(await self._identify_timeline_risks(project))
+        risks = []
+        categories = {}
         
-        return risks
+        for category, section in sections.items():
+            risks.extend(section["data"] or [])
+            
+            categories[category] = {
+                "failed": section["partial"],
+                "timedOut": bool(section["missing"]),
+                "error": section["errors"].get("value"),
+                "latencyMs": section["latencyMs"]
+            }
+            
+        return {
+            "risks": risks,
+            "categories": categories
+        }
 
     async def _assess_risks(
         self,
         risks: List[Dict]
     ) -> List[Dict]:
         """Assess identified risks"""
-        assessed = []
+        semaphore = asyncio.Semaphore(self.max_concurrency)
         
-        for risk in risks:
-            assessment = {
-                **risk,
-                "probability": await self._calculate_probability(risk),
-                "impact": await self._calculate_impact(risk),
-                "severity": await self._calculate_severity(risk),
-                "urgency": await self._calculate_urgency(risk)
-            }
-            
-            assessed.append(assessment)
-            
-        return assessed
+        # gather keeps results in input order
+        return list(await asyncio.gather(*[
+            self._assess_risk(risk, semaphore) for risk in risks
+        ]))
+
+    async def _assess_risk(
+        self,
+        risk: Dict,
+        semaphore: asyncio.Semaphore
+    ) -> Dict:
+        """Assess a single risk, scoring all four dimensions at once"""
+        probability, impact, severity, urgency = await asyncio.gather(
+            self._bounded(semaphore, self._calculate_probability(risk)),
+            self._bounded(semaphore, self._calculate_impact(risk)),
+            self._bounded(semaphore, self._calculate_severity(risk)),
+            self._bounded(semaphore, self._calculate_urgency(risk))
+        )
+        
+        return {
+            **risk,
+            "probability": probability,
+            "impact": impact,
+            "severity": severity,
+            "urgency": urgency
+        }
 
     async def _generate_mitigations(
         self,
         risks: List[Dict]
     ) -> List[Dict]:
         """Generate mitigation strategies for risks"""
-        mitigations = []
+        semaphore = asyncio.Semaphore(self.max_concurrency)
         
-        for risk in risks:
-            strategies = await self._generate_risk_strategies(risk)
-            
-            mitigations.append({
+        all_strategies = await asyncio.gather(*[
+            self._bounded(semaphore, self._generate_risk_strategies(risk))
+            for risk in risks
+        ])
+        
+        return [
+            {
                 "risk_id": risk["id"],
                 "strategies": strategies,
                 "recommended": self._select_best_strategy(strategies)
-            })
-            
-        return mitigations
\ No newline at end of file
+            }
+            for risk, strategies in zip(risks, all_strategies)
+        ]
+
+    async def _bounded(
+        self,
+        semaphore: asyncio.Semaphore,
+        awaitable: Awaitable
+    ):
+        """Await a call while holding a concurrency slot"""
+        async with semaphore:
+            return await awaitable
\ No newline at end of file
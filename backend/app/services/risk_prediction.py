@@ -1,12 +1,46 @@
+import asyncio
+from typing import Dict, List, Iterable, Optional, Tuple
+from datetime import datetime, timedelta
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from app.models import Project, Risk, RiskMetric
 from app.utils.time_series import TimeSeriesAnalyzer
+from app.utils.model_registry import ModelRegistry
+from app.utils.compute_pool import ComputeExecutor, compute_executor
+from app.utils.risk_history import (
+    align_factors,
+    factor_vocabulary,
+    load_columnar_history,
+    load_columnar_histories
+)
+
+PORTFOLIO_MODEL = "risk_prediction/_portfolio"
+
+def _fit_risk_model(
+    features: np.ndarray,
+    risk_levels: List[float]
+) -> RandomForestRegressor:
+    """Train a risk level regressor (runs in a compute worker)"""
+    model = RandomForestRegressor(n_estimators=100)
+    model.fit(features, risk_levels)
+    return model
 
 class RiskPredictionService:
-    def __init__(self):
-        self.model = RandomForestRegressor(n_estimators=100)
+    def __init__(
+        self,
+        registry: Optional[ModelRegistry] = None,
+        retrain_threshold: int = 500,
+        compute: Optional[ComputeExecutor] = None,
+        history_window_days: Optional[int] = None,
+        history_batch_size: int = 5000
+    ):
+        self.registry = registry or ModelRegistry()
+        self.compute = compute or compute_executor
+        self.retrain_threshold = retrain_threshold
+        self.history_window_days = history_window_days
+        self.history_batch_size = history_batch_size
         self.time_series = TimeSeriesAnalyzer()
+        self._model_locks: Dict[str, asyncio.Lock] = {}
 
     async def predict_project_risks(
         self,
@@ -17,14 +51,26 @@ class RiskPredictionService:
         # Get historical data
         history = await self._get_risk_history(project_id)
         
-        # Prepare features
-        features = self._prepare_prediction_features(history)
-        
-        # Train model
-        self._train_model(features, history['risk_levels'])
+        # A project without any metrics has nothing to predict from
+        if not len(history['risk_levels']):
+            return {
+                "predictions": {},
+                "alerts": [],
+                "confidence": None
+            }
+            
+        # Load the persisted model, training only on a cold start
+        model, factor_names = await self._get_model(
+            self._model_name(project_id),
+            [history]
+        )
         
-        # Generate predictions
-        predictions = self._generate_predictions(features, horizon_days)
+        # Generate predictions in the factor layout the model was trained on
+        predictions = await self._generate_predictions(
+            model,
+            align_factors(history, factor_names),
+            horizon_days
+        )
         
         # Identify potential alerts
         alerts = self._identify_risk_alerts(predictions)
@@ -35,15 +81,308 @@ class RiskPredictionService:
             "confidence": self._calculate_prediction_confidence(predictions)
         }
 
-    async def _get_risk_history(self, project_id: str) -> Dict:
-        """Get historical risk data"""
-        metrics = await RiskMetric.find_by_project(project_id)
+    async def predict_portfolio_risks(
+        self,
+        project_ids: List[str],
+        horizon_days: int = 30
+    ) -> Dict[str, Dict]:
+        """Predict risks for many projects with one query and one predict"""
+        histories = await self._get_risk_histories(project_ids)
         
-        return {
-            "timestamps": [m.timestamp for m in metrics],
-            "risk_levels": [m.risk_level for m in metrics],
-            "factors": [m.contributing_factors for m in metrics]
+        # Projects without any metrics have nothing to predict from
+        project_ids = [
+            project_id for project_id in project_ids
+            if len(histories[project_id]['risk_levels'])
+        ]
+        if not project_ids:
+            return {}
+            
+        model, factor_names = await self._get_model(
+            PORTFOLIO_MODEL,
+            [histories[project_id] for project_id in project_ids]
+        )
+        
+        # One factor layout for every project, so the horizons stack into a
+        # single predict call
+        all_predictions = await self._generate_batch_predictions(
+            model,
+            [
+                align_factors(histories[project_id], factor_names)
+                for project_id in project_ids
+            ],
+            horizon_days
+        )
+        
+        results = {}
+        
+        for project_id, predictions in zip(project_ids, all_predictions):
+            results[project_id] = {
+                "predictions": predictions,
+                "alerts": self._identify_risk_alerts(predictions),
+                "confidence": self._calculate_prediction_confidence(
+                    predictions
+                )
+            }
+            
+        return results
+
+    async def retrain_models(
+        self,
+        project_ids: Iterable[str]
+    ) -> Dict[str, int]:
+        """Retrain models whose projects gained enough new metrics.
+
+        The portfolio model is retrained from the same projects, so pass
+        every project the portfolio predictions cover. Meant to run from a
+        scheduled job, off the request path.
+        """
+        project_ids = list(project_ids)
+        histories = await self._get_risk_histories(project_ids)
+        
+        # Projects without any metrics have nothing to train on
+        histories = {
+            project_id: history for project_id, history in histories.items()
+            if len(history['risk_levels'])
         }
+        versions = {}
+        
+        for project_id, history in histories.items():
+            name = self._model_name(project_id)
+            
+            if self._needs_retraining(name, [history]):
+                async with self._model_lock(name):
+                    versions[project_id] = await self._fit_and_save(
+                        name,
+                        [history]
+                    )
+                
+        portfolio = list(histories.values())
+        
+        if portfolio and self._needs_retraining(PORTFOLIO_MODEL, portfolio):
+            async with self._model_lock(PORTFOLIO_MODEL):
+                versions[PORTFOLIO_MODEL] = await self._fit_and_save(
+                    PORTFOLIO_MODEL,
+                    portfolio
+                )
+            
+        return versions
+
+    async def _get_model(
+        self,
+        name: str,
+        histories: List[Dict]
+    ) -> Tuple[RandomForestRegressor, List[str]]:
+        """Get a model and its factor layout, training on a cold start"""
+        loaded = self._load_model(name)
+        if loaded is not None:
+            return loaded
+            
+        # Concurrent cold starts wait for the first fit instead of each
+        # fitting and saving their own version
+        async with self._model_lock(name):
+            loaded = self._load_model(name)
+            if loaded is not None:
+                return loaded
+                
+            await self._fit_and_save(name, histories)
+            return self._load_model(name)
+
+    def _load_model(
+        self,
+        name: str
+    ) -> Optional[Tuple[RandomForestRegressor, List[str]]]:
+        """Load a model and its factor layout from the registry"""
+        loaded = self.registry.load(name)
+        
+        # Models saved without their factor layout can't be fed safely
+        if loaded is None or "factorNames" not in loaded[1]:
+            return None
+            
+        return loaded[0], loaded[1]["factorNames"]
+
+    def _model_lock(self, name: str) -> asyncio.Lock:
+        """Get the lock serializing fits of one model"""
+        return self._model_locks.setdefault(name, asyncio.Lock())
+
+    def _needs_retraining(
+        self,
+        name: str,
+        histories: List[Dict]
+    ) -> bool:
+        """Check whether enough new RiskMetric rows arrived since training"""
+        metadata = self.registry.metadata(name)
+        
+        if (
+            metadata is None
+            or "trainedThrough" not in metadata
+            or "factorNames" not in metadata
+        ):
+            return True
+            
+        # The model ignores factors it was not trained on
+        if set(factor_vocabulary(histories)) - set(metadata["factorNames"]):
+            return True
+            
+        # Count by timestamp, since a windowed history doesn't only grow
+        trained_through = np.datetime64(metadata["trainedThrough"])
+        new_rows = sum(
+            np.count_nonzero(history['timestamps'] > trained_through)
+            for history in histories
+        )
+        return new_rows >= self.retrain_threshold
+
+    async def _fit_and_save(
+        self,
+        name: str,
+        histories: List[Dict]
+    ) -> int:
+        """Fit a fresh model and register it as a new version"""
+        # The factor layout is fixed here and stored with the model
+        factor_names = factor_vocabulary(histories)
+        aligned = [align_factors(h, factor_names) for h in histories]
+        
+        features = np.vstack([
+            self._prepare_prediction_features(history) for history in aligned
+        ])
+        risk_levels = np.concatenate([h['risk_levels'] for h in aligned])
+        timestamps = np.concatenate([h['timestamps'] for h in aligned])
+        
+        model = await self.compute.run(_fit_risk_model, features, risk_levels)
+        
+        return self.registry.save(
+            name,
+            model,
+            {
+                "rows": len(risk_levels),
+                "trainedThrough": str(timestamps.max()),
+                "factorNames": factor_names
+            }
+        )
+
+    def _model_name(self, project_id: str) -> str:
+        """Get the registry name of a project's model"""
+        return f"risk_prediction/{project_id}"
+
+    async def _generate_predictions(
+        self,
+        model: RandomForestRegressor,
+        history: Dict,
+        horizon_days: int
+    ) -> Dict:
+        """Predict daily risk levels over the horizon for one project"""
+        return (await self._generate_batch_predictions(
+            model,
+            [history],
+            horizon_days
+        ))[0]
+
+    async def _generate_batch_predictions(
+        self,
+        model: RandomForestRegressor,
+        histories: List[Dict],
+        horizon_days: int
+    ) -> List[Dict]:
+        """Predict daily risk levels over the horizon for many projects"""
+        horizons = [
+            self._horizon_features(history, horizon_days)
+            for history in histories
+        ]
+        
+        # Every tree predicts every stacked row, so keep it off the event
+        # loop; a thread avoids pickling the forest into a worker process
+        risk_levels, uncertainties = await asyncio.to_thread(
+            self._predict_with_uncertainty,
+            model,
+            np.vstack([features for _, features in horizons])
+        )
+        
+        results = []
+        offset = 0
+        
+        for history, (dates, _) in zip(histories, horizons):
+            factors = dict(zip(
+                history['factor_names'],
+                history['factors'][-1].tolist()
+            ))
+            predictions = {}
+            
+            for i, date in enumerate(dates, start=offset):
+                predictions[date] = {
+                    "risk_level": float(risk_levels[i]),
+                    "factors": factors,
+                    "uncertainty": float(uncertainties[i]),
+                    "confidence": 1 - float(uncertainties[i])
+                }
+                
+            results.append(predictions)
+            offset += len(dates)
+            
+        return results
+
+    def _horizon_features(
+        self,
+        history: Dict,
+        horizon_days: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Build one feature row per day after the latest observation.
+
+        Temporal features follow the future dates; factor and trend
+        features are held at their latest observed values.
+        """
+        dates = history['timestamps'][-1] + np.arange(
+            1,
+            max(horizon_days, 1) + 1
+        ) * np.timedelta64(1, 'D')
+        temporal = self.time_series.extract_temporal_features(dates)
+        latest = self._prepare_prediction_features(history)[-1]
+        held = np.tile(latest[temporal.shape[1]:], (len(dates), 1))
+        
+        return dates, np.hstack([temporal, held])
+
+    def _predict_with_uncertainty(
+        self,
+        model: RandomForestRegressor,
+        features: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Predict risk levels and their relative spread across trees"""
+        per_tree = np.stack([
+            tree.predict(features) for tree in model.estimators_
+        ])
+        levels = per_tree.mean(axis=0)
+        spread = per_tree.std(axis=0) / (np.abs(levels) + 1e-9)
+        
+        return levels, np.clip(spread, 0.0, 1.0)
+
+    async def _get_risk_histories(
+        self,
+        project_ids: List[str]
+    ) -> Dict[str, Dict]:
+        """Get columnar risk history for many projects in one query"""
+        return await load_columnar_histories(
+            project_ids,
+            RiskMetric.iter_by_projects(
+                project_ids,
+                since=self._history_start(),
+                batch_size=self.history_batch_size
+            )
+        )
+
+    async def _get_risk_history(self, project_id: str) -> Dict:
+        """Get historical risk data as typed columns"""
+        return await load_columnar_history(
+            RiskMetric.iter_by_project(
+                project_id,
+                since=self._history_start(),
+                batch_size=self.history_batch_size
+            )
+        )
+
+    def _history_start(self) -> Optional[datetime]:
+        """Get the start of the history window, if one is configured"""
+        if self.history_window_days is None:
+            return None
+            
+        return datetime.utcnow() - timedelta(days=self.history_window_days)
 
     def _prepare_prediction_features(self, history: Dict) -> np.ndarray:
         """Prepare features for prediction"""
@@ -54,10 +393,8 @@ class RiskPredictionService:
             history['timestamps']
         ))
         
-        # Risk factor features
-        features.append(self._extract_risk_factors(
-            history['factors']
-        ))
+        # Risk factor features, already a dense matrix
+        features.append(history['factors'])
         
         # Trend features
         features.append(self.time_series.extract_trend_features(
@@ -0,0 +1,318 @@
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+
+class MomentsAccumulator:
+    """Per-column count, mean, variance, min and max over streamed chunks.
+
+    Uses Chan's parallel update, so two accumulators built on different
+    partitions merge into exactly what one pass over both would give.
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        width = len(self.columns)
+        self.count = np.zeros(width)
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+
+    def update(self, frame: pd.DataFrame) -> None:
+        """Fold a chunk of rows into the running moments"""
+        values = frame[self.columns].to_numpy(dtype=np.float64)
+        mask = ~np.isnan(values)
+        count = mask.sum(axis=0)
+        filled = np.where(mask, values, 0.0)
+        safe_count = np.maximum(count, 1)
+        mean = filled.sum(axis=0) / safe_count
+        m2 = (np.where(mask, values - mean, 0.0) ** 2).sum(axis=0)
+
+        self._combine(
+            count,
+            mean,
+            m2,
+            np.where(mask, values, np.inf).min(axis=0, initial=np.inf),
+            np.where(mask, values, -np.inf).max(axis=0, initial=-np.inf)
+        )
+
+    def merge(self, other: "MomentsAccumulator") -> "MomentsAccumulator":
+        """Fold another accumulator over the same columns into this one"""
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    def result(self) -> Dict[str, Dict]:
+        """Get summary statistics per column"""
+        variance = np.where(
+            self.count > 1,
+            self.m2 / np.maximum(self.count - 1, 1),
+            np.nan
+        )
+
+        return {
+            column: {
+                "count": int(self.count[i]),
+                "mean": float(self.mean[i]) if self.count[i] else None,
+                "std": float(np.sqrt(variance[i])) if self.count[i] > 1 else None,
+                "min": float(self.min[i]) if self.count[i] else None,
+                "max": float(self.max[i]) if self.count[i] else None
+            }
+            for i, column in enumerate(self.columns)
+        }
+
+    def _combine(
+        self,
+        count: np.ndarray,
+        mean: np.ndarray,
+        m2: np.ndarray,
+        minimum: np.ndarray,
+        maximum: np.ndarray
+    ) -> None:
+        """Merge partial moments into the running totals"""
+        total = self.count + count
+        safe_total = np.maximum(total, 1)
+        delta = mean - self.mean
+
+        self.mean = self.mean + delta * count / safe_total
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * count / safe_total
+        self.count = total
+        self.min = np.minimum(self.min, minimum)
+        self.max = np.maximum(self.max, maximum)
+
+
+class CovarianceAccumulator:
+    """Running mean vector and co-moment matrix for pairwise correlations.
+
+    Rows with a missing value in any tracked column are skipped, so the
+    result matches a complete-case correlation over all rows seen.
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        width = len(self.columns)
+        self.count = 0
+        self.mean = np.zeros(width)
+        self.comoment = np.zeros((width, width))
+
+    def update(self, frame: pd.DataFrame) -> None:
+        """Fold a chunk of rows into the running co-moments"""
+        values = frame[self.columns].to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values).any(axis=1)]
+
+        if len(values) == 0:
+            return
+
+        mean = values.mean(axis=0)
+        centered = values - mean
+        self._combine(len(values), mean, centered.T @ centered)
+
+    def merge(
+        self,
+        other: "CovarianceAccumulator"
+    ) -> "CovarianceAccumulator":
+        """Fold another accumulator over the same columns into this one"""
+        self._combine(other.count, other.mean, other.comoment)
+        return self
+
+    def correlation(self) -> pd.DataFrame:
+        """Get the Pearson correlation matrix"""
+        scale = np.sqrt(np.diag(self.comoment))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            matrix = self.comoment / np.outer(scale, scale)
+
+        return pd.DataFrame(matrix, index=self.columns, columns=self.columns)
+
+    def _combine(
+        self,
+        count: int,
+        mean: np.ndarray,
+        comoment: np.ndarray
+    ) -> None:
+        """Merge partial co-moments into the running totals"""
+        if count == 0:
+            return
+
+        total = self.count + count
+        delta = mean - self.mean
+
+        self.comoment = (
+            self.comoment
+            + comoment
+            + np.outer(delta, delta) * self.count * count / total
+        )
+        self.mean = self.mean + delta * count / total
+        self.count = total
+
+
+class CorrelationStore:
+    """Co-moments per time bucket for correlations over any window.
+
+    Each bucket is a CovarianceAccumulator, so rows are scanned once when
+    they arrive and a window's correlation matrix comes from merging its
+    buckets in O(buckets * columns^2). Stores built on different partitions
+    merge bucket by bucket.
+    """
+
+    def __init__(
+        self,
+        columns: List[str],
+        date_column: str = 'date',
+        freq: str = 'D'
+    ):
+        self.columns = list(columns)
+        self.date_column = date_column
+        self.freq = freq
+        self.rows = 0
+        self.buckets: Dict[Optional[pd.Period], CovarianceAccumulator] = {}
+
+    def update(self, frame: pd.DataFrame) -> None:
+        """Fold a chunk of rows into their time buckets"""
+        if frame.empty:
+            return
+
+        self.rows += len(frame)
+
+        # Undated rows only count towards unwindowed correlations
+        if self.date_column not in frame.columns:
+            self._bucket(None).update(frame)
+            return
+
+        periods = pd.to_datetime(frame[self.date_column]).dt.to_period(self.freq)
+        for period, rows in frame.groupby(periods):
+            self._bucket(period).update(rows)
+
+    def merge(self, other: "CorrelationStore") -> "CorrelationStore":
+        """Fold another store over the same columns into this one"""
+        for period, bucket in other.buckets.items():
+            self._bucket(period).merge(bucket)
+        self.rows += other.rows
+        return self
+
+    def window(
+        self,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None
+    ) -> CovarianceAccumulator:
+        """Merge the buckets overlapping [start, end] into one accumulator"""
+        total = CovarianceAccumulator(self.columns)
+        windowed = start is not None or end is not None
+
+        for period, bucket in self.buckets.items():
+            if period is None:
+                if windowed:
+                    continue
+            elif (
+                (start is not None and period.end_time < start)
+                or (end is not None and period.start_time > end)
+            ):
+                continue
+            total.merge(bucket)
+
+        return total
+
+    def correlation(
+        self,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        """Get the Pearson correlation matrix over a window"""
+        return self.window(start, end).correlation()
+
+    def _bucket(self, period: Optional[pd.Period]) -> CovarianceAccumulator:
+        """Get or create the accumulator of one bucket"""
+        bucket = self.buckets.get(period)
+        if bucket is None:
+            bucket = self.buckets[period] = CovarianceAccumulator(self.columns)
+        return bucket
+
+
+class TrendAccumulator:
+    """Per-period sums and counts of each column, used to fit trends"""
+
+    def __init__(
+        self,
+        columns: List[str],
+        date_column: str = 'date',
+        freq: str = 'M'
+    ):
+        self.columns = list(columns)
+        self.date_column = date_column
+        self.freq = freq
+        self.sums: Dict[pd.Period, np.ndarray] = {}
+        self.counts: Dict[pd.Period, np.ndarray] = {}
+
+    def update(self, frame: pd.DataFrame) -> None:
+        """Fold a chunk of rows into the period buckets"""
+        if self.date_column not in frame.columns or frame.empty:
+            return
+
+        periods = pd.to_datetime(frame[self.date_column]).dt.to_period(self.freq)
+        grouped = frame[self.columns].astype(np.float64).groupby(periods)
+
+        self._add(grouped.sum(), grouped.count())
+
+    def merge(self, other: "TrendAccumulator") -> "TrendAccumulator":
+        """Fold another accumulator over the same columns into this one"""
+        for period, sums in other.sums.items():
+            self._add_bucket(period, sums, other.counts[period])
+        return self
+
+    def result(self) -> Dict:
+        """Get per-period means and a linear slope per column"""
+        periods = sorted(self.sums)
+
+        if not periods:
+            return {"periods": [], "means": {}, "slopes": {}}
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = np.vstack([
+                self.sums[p] / self.counts[p] for p in periods
+            ])
+
+        slopes: Dict[str, Optional[float]] = {}
+        steps = np.arange(len(periods), dtype=np.float64)
+
+        for i, column in enumerate(self.columns):
+            valid = ~np.isnan(means[:, i])
+            slopes[column] = (
+                float(np.polyfit(steps[valid], means[valid, i], 1)[0])
+                if valid.sum() > 1 else None
+            )
+
+        return {
+            "periods": [str(p) for p in periods],
+            "means": {
+                column: means[:, i].tolist()
+                for i, column in enumerate(self.columns)
+            },
+            "slopes": slopes
+        }
+
+    def _add(
+        self,
+        sums: pd.DataFrame,
+        counts: pd.DataFrame
+    ) -> None:
+        """Add grouped chunk totals to the buckets"""
+        for period in sums.index:
+            self._add_bucket(
+                period,
+                sums.loc[period].to_numpy(),
+                counts.loc[period].to_numpy(dtype=np.float64)
+            )
+
+    def _add_bucket(
+        self,
+        period: pd.Period,
+        sums: np.ndarray,
+        counts: np.ndarray
+    ) -> None:
+        """Add totals to one period bucket"""
+        if period in self.sums:
+            self.sums[period] = self.sums[period] + sums
+            self.counts[period] = self.counts[period] + counts
+        else:
+            self.sums[period] = np.array(sums, dtype=np.float64)
+            self.counts[period] = np.array(counts, dtype=np.float64)
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class ComputePoolSaturated(Exception):
+    """Raised when the compute pool cannot accept more work in time"""
+
+
+def _timed_call(
+    fn: Callable,
+    args: tuple,
+    kwargs: Dict
+) -> tuple:
+    """Run `fn` in a worker and report when it started and how long it ran"""
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return result, started, time.time() - started
+
+
+class ComputeExecutor:
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: int = 32,
+        submit_timeout: Optional[float] = 5.0
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.submit_timeout = submit_timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "queueWaitTotal": 0.0,
+            "queueWaitMax": 0.0,
+            "computeTotal": 0.0,
+            "computeMax": 0.0
+        }
+
+    async def run(
+        self,
+        fn: Callable,
+        *args,
+        **kwargs
+    ) -> Any:
+        """Run a picklable, CPU-bound callable in the process pool"""
+        # Queue wait includes time blocked on backpressure, not just the
+        # time a worker takes to pick the call up
+        submitted = time.time()
+        await self._acquire()
+        self._in_flight += 1
+        self._metrics["submitted"] += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, elapsed = await loop.run_in_executor(
+                self._get_pool(),
+                _timed_call,
+                fn,
+                args,
+                kwargs
+            )
+        except Exception:
+            self._metrics["failed"] += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+        self._record(max(started - submitted, 0.0), elapsed)
+        return result
+
+    def stats(self) -> Dict:
+        """Get queue wait and compute time metrics for the pool"""
+        completed = self._metrics["completed"] or 1
+
+        return {
+            "workers": self.max_workers,
+            "capacity": self.max_workers + self.max_queue,
+            "inFlight": self._in_flight,
+            "submitted": self._metrics["submitted"],
+            "completed": self._metrics["completed"],
+            "failed": self._metrics["failed"],
+            "rejected": self._metrics["rejected"],
+            "avgQueueWaitMs": self._metrics["queueWaitTotal"] / completed * 1000,
+            "maxQueueWaitMs": self._metrics["queueWaitMax"] * 1000,
+            "avgComputeMs": self._metrics["computeTotal"] / completed * 1000,
+            "maxComputeMs": self._metrics["computeMax"] * 1000
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def _acquire(self) -> None:
+        """Wait for a pool slot, rejecting work once the queue stays full"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.submit_timeout)
+        except asyncio.TimeoutError:
+            self._metrics["rejected"] += 1
+            raise ComputePoolSaturated(
+                f"Compute pool saturated ({self._in_flight} jobs in flight)"
+            )
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Start the worker processes on first use"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _record(
+        self,
+        queue_wait: float,
+        compute: float
+    ) -> None:
+        """Record timings of a finished job"""
+        self._metrics["completed"] += 1
+        self._metrics["queueWaitTotal"] += queue_wait
+        self._metrics["queueWaitMax"] = max(
+            self._metrics["queueWaitMax"],
+            queue_wait
+        )
+        self._metrics["computeTotal"] += compute
+        self._metrics["computeMax"] = max(
+            self._metrics["computeMax"],
+            compute
+        )
+
+
+# Shared by every service that submits model fitting or inference
+compute_executor = ComputeExecutor(
+    max_workers=int(os.environ.get('COMPUTE_POOL_WORKERS', 0)) or None,
+    max_queue=int(os.environ.get('COMPUTE_POOL_QUEUE', 32))
+)
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+QueryFactory = Callable[[], Awaitable[Any]]
+Section = Union[QueryFactory, Dict[str, QueryFactory]]
+
+
+class FanOutExecutor:
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        section_timeout: float = 5.0
+    ):
+        self.max_concurrency = max_concurrency
+        self.section_timeout = section_timeout
+
+    async def run(
+        self,
+        sections: Dict[str, Section],
+        timeouts: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Dict]:
+        """Run every section concurrently and collect results per section"""
+        timeouts = timeouts or {}
+        # One semaphore per call bounds the queries in flight across sections
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        names = list(sections)
+
+        results = await asyncio.gather(*[
+            self._run_section(
+                semaphore,
+                sections[name],
+                timeouts.get(name, self.section_timeout)
+            )
+            for name in names
+        ])
+
+        return dict(zip(names, results))
+
+    async def _run_section(
+        self,
+        semaphore: asyncio.Semaphore,
+        section: Section,
+        timeout: float
+    ) -> Dict:
+        """Run the queries of one section until they finish or time out"""
+        started = time.perf_counter()
+        single = callable(section)
+        queries = {None: section} if single else section
+
+        tasks = {
+            key: asyncio.ensure_future(self._run_query(semaphore, factory))
+            for key, factory in queries.items()
+        }
+
+        pending = set()
+        if tasks:
+            _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+
+        # Cancel whatever is still running and let it unwind
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        data = {}
+        missing = []
+        errors = {}
+
+        for key, task in tasks.items():
+            if task in pending:
+                missing.append(key)
+                data[key] = None
+            elif task.exception() is not None:
+                errors[key] = str(task.exception())
+                data[key] = None
+            else:
+                data[key] = task.result()
+
+        if single:
+            data = data[None]
+            missing = ["value"] if missing else []
+            errors = {"value": errors[None]} if errors else {}
+
+        return {
+            "data": data,
+            "partial": bool(missing or errors),
+            "missing": missing,
+            "errors": errors,
+            "latencyMs": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    async def _run_query(
+        self,
+        semaphore: asyncio.Semaphore,
+        factory: QueryFactory
+    ) -> Any:
+        """Run a single query while holding a concurrency slot"""
+        async with semaphore:
+            return await factory()
@@ -0,0 +1,116 @@
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import joblib
+
+
+class ModelRegistry:
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        keep_versions: int = 3
+    ):
+        self.root = root or os.environ.get('MODEL_REGISTRY_DIR', 'models')
+        self.keep_versions = keep_versions
+        self._loaded: Dict[str, Tuple[int, Any, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def save(
+        self,
+        name: str,
+        model: Any,
+        metadata: Optional[Dict] = None
+    ) -> int:
+        """Persist a fitted model as the next version of `name`"""
+        directory = self._directory(name)
+        os.makedirs(directory, exist_ok=True)
+
+        with self._lock:
+            version = (self.latest_version(name) or 0) + 1
+            metadata = {
+                **(metadata or {}),
+                "version": version,
+                "trainedAt": datetime.utcnow().isoformat()
+            }
+
+            # Write to temp files first so readers never see half a model
+            model_path = os.path.join(directory, f"v{version}.joblib")
+            joblib.dump(model, model_path + '.tmp')
+            os.replace(model_path + '.tmp', model_path)
+
+            meta_path = os.path.join(directory, f"v{version}.json")
+            with open(meta_path + '.tmp', 'w') as f:
+                json.dump(metadata, f)
+            os.replace(meta_path + '.tmp', meta_path)
+
+            self._loaded[name] = (version, model, metadata)
+            self._prune(name)
+
+        return version
+
+    def load(self, name: str) -> Optional[Tuple[Any, Dict]]:
+        """Load the latest version of `name`, reusing it once in memory"""
+        version = self.latest_version(name)
+
+        if version is None:
+            return None
+
+        loaded = self._loaded.get(name)
+        if loaded is not None and loaded[0] == version:
+            return loaded[1], loaded[2]
+
+        directory = self._directory(name)
+
+        # Memory-map the numpy arrays inside the model instead of copying
+        model = joblib.load(
+            os.path.join(directory, f"v{version}.joblib"),
+            mmap_mode='r'
+        )
+        with open(os.path.join(directory, f"v{version}.json")) as f:
+            metadata = json.load(f)
+
+        self._loaded[name] = (version, model, metadata)
+        return model, metadata
+
+    def metadata(self, name: str) -> Optional[Dict]:
+        """Get metadata of the latest version of `name`"""
+        loaded = self.load(name)
+        return loaded[1] if loaded else None
+
+    def latest_version(self, name: str) -> Optional[int]:
+        """Get the newest persisted version of `name`"""
+        versions = self._versions(name)
+        return versions[-1] if versions else None
+
+    def _versions(self, name: str) -> List[int]:
+        """List persisted versions of `name` in ascending order"""
+        directory = self._directory(name)
+
+        if not os.path.isdir(directory):
+            return []
+
+        return sorted(
+            int(match.group(1))
+            for match in (
+                re.fullmatch(r'v(\d+)\.json', entry)
+                for entry in os.listdir(directory)
+            )
+            if match
+        )
+
+    def _prune(self, name: str) -> None:
+        """Remove versions beyond the retention limit"""
+        directory = self._directory(name)
+
+        for version in self._versions(name)[:-self.keep_versions]:
+            for suffix in ('json', 'joblib'):
+                path = os.path.join(directory, f"v{version}.{suffix}")
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _directory(self, name: str) -> str:
+        """Get the directory holding every version of `name`"""
+        return os.path.join(self.root, re.sub(r'[^\w.-]', '_', name))
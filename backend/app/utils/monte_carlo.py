@@ -0,0 +1,64 @@
+from typing import Dict, Iterable, Optional
+import numpy as np
+
+PERCENTILES = (10, 50, 90)
+
+
+def simulate_percentile_bands(
+    series: Dict[str, np.ndarray],
+    horizon: int,
+    paths: int = 5000,
+    seed: int = 0,
+    max_samples: int = 5_000_000,
+    non_decreasing: Iterable[str] = ('progress', 'cost'),
+    upper_bounds: Optional[Dict[str, float]] = None
+) -> Dict:
+    """Bootstrap future paths for each series and summarize them as bands.
+
+    Daily increments are resampled from each series' own history, so every
+    path for every metric is drawn in a single vectorized pass. The path
+    count is capped so `paths * horizon` never exceeds `max_samples`,
+    which keeps runtime bounded regardless of the requested size.
+    """
+    horizon = max(int(horizon), 1)
+    paths = max(1, min(int(paths), max_samples // horizon))
+    rng = np.random.default_rng(seed)
+    non_decreasing = set(non_decreasing)
+    upper_bounds = upper_bounds or {}
+    bands = {}
+
+    for name, values in series.items():
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+
+        if len(values) == 0:
+            continue
+
+        increments = np.diff(values)
+        if len(increments) == 0:
+            increments = np.zeros(1)
+        if name in non_decreasing:
+            increments = np.maximum(increments, 0.0)
+
+        sampled = rng.choice(
+            increments.astype(np.float32),
+            size=(paths, horizon)
+        )
+        simulated = np.float32(values[-1]) + np.cumsum(sampled, axis=1)
+
+        if name in upper_bounds:
+            np.minimum(simulated, upper_bounds[name], out=simulated)
+
+        bands[name] = {
+            f"p{q}": band
+            for q, band in zip(
+                PERCENTILES,
+                np.percentile(simulated, PERCENTILES, axis=0)
+            )
+        }
+
+    return {
+        "paths": paths,
+        "seed": seed,
+        "bands": bands
+    }
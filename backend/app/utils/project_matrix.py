@@ -0,0 +1,166 @@
+import warnings
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from scipy import stats
+
+COMPARISON_METRICS = ("progress", "costEfficiency", "riskIndex")
+
+# Variance kind -> (actual field, planned field). This is an assumed
+# project schema standing in for the per-kind _analyze_*_variance helpers
+# of ComparisonService, not a port of them: every variance is relative,
+# (actual - planned) / planned, and projects missing either field (or
+# with no positive plan) get NaN for that kind.
+VARIANCE_FIELDS = {
+    "schedule": ("actualDuration", "plannedDuration"),
+    "cost": ("actualCost", "budget"),
+    "quality": ("qualityScore", "qualityTarget")
+}
+
+PROJECT_FIELDS = COMPARISON_METRICS + tuple(
+    field for pair in VARIANCE_FIELDS.values() for field in pair
+)
+
+
+class ProjectMatrix:
+    """Numeric project fields as one float matrix, a row per project.
+
+    Missing fields are stored as NaN so every statistic can run over whole
+    columns at once. The source records are kept for sections that still
+    work on per-project dicts.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        fields: Sequence[str],
+        values: np.ndarray,
+        records: Optional[List[Dict]] = None
+    ):
+        self.ids = list(ids)
+        self.fields = list(fields)
+        self.values = values
+        self.records = records if records is not None else []
+        self._positions = {field: i for i, field in enumerate(self.fields)}
+
+    @classmethod
+    def from_records(
+        cls,
+        records: List[Dict],
+        fields: Iterable[str] = PROJECT_FIELDS
+    ) -> "ProjectMatrix":
+        """Pack project dicts into a matrix in one pass"""
+        fields = list(fields)
+        values = np.array(
+            [
+                [_to_float(record.get(field)) for field in fields]
+                for record in records
+            ],
+            dtype=np.float64
+        ).reshape(len(records), len(fields))
+
+        return cls(
+            [str(record.get("id")) for record in records],
+            fields,
+            values,
+            records
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def columns(self, fields: Sequence[str]) -> np.ndarray:
+        """Get several fields as an (n_projects, n_fields) matrix"""
+        return self.values[:, [self._positions[field] for field in fields]]
+
+    def variances(self) -> Dict[str, np.ndarray]:
+        """Get relative actual-vs-planned variances for every project"""
+        actual = self.columns([a for a, _ in VARIANCE_FIELDS.values()])
+        planned = self.columns([p for _, p in VARIANCE_FIELDS.values()])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relative = np.where(planned > 0, (actual - planned) / planned, np.nan)
+
+        return {
+            kind: relative[:, i]
+            for i, kind in enumerate(VARIANCE_FIELDS)
+        }
+
+
+def describe_columns(
+    values: np.ndarray,
+    reference: np.ndarray,
+    alpha: float = 0.05
+) -> Dict[str, np.ndarray]:
+    """Summarize every column and test its mean against a reference value.
+
+    `values` is (n_rows, n_columns) with NaN for missing entries and
+    `reference` holds one value per column. Each statistic comes back as
+    an array with one entry per column.
+    """
+    count = np.sum(~np.isnan(values), axis=0)
+
+    # Reductions over zero rows raise, so pad with one all-NaN row; it
+    # doesn't change any NaN-aware statistic
+    if values.shape[0] == 0:
+        values = np.full((1, values.shape[1]), np.nan)
+
+    # All-NaN columns and single-row columns come out as NaN
+    with np.errstate(divide='ignore', invalid='ignore'), \
+            warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0, ddof=1)
+        minimum = np.nanmin(values, axis=0)
+        maximum = np.nanmax(values, axis=0)
+        p25, median, p75 = np.nanpercentile(values, [25, 50, 75], axis=0)
+        t_stat = (mean - reference) / (std / np.sqrt(count))
+
+    p_value = np.where(
+        count > 1,
+        2 * stats.t.sf(np.abs(t_stat), np.maximum(count - 1, 1)),
+        np.nan
+    )
+
+    return {
+        "count": count,
+        "mean": mean,
+        "std": std,
+        "min": minimum,
+        "p25": p25,
+        "median": median,
+        "p75": p75,
+        "max": maximum,
+        "gap": mean - reference,
+        "tStat": t_stat,
+        "pValue": p_value,
+        "significant": p_value < alpha
+    }
+
+
+def column_summary(
+    described: Dict[str, np.ndarray],
+    i: int
+) -> Dict:
+    """Pick one column out of `describe_columns` as plain values"""
+    summary = {}
+
+    for key, values in described.items():
+        value = values[i].item()
+        if isinstance(value, float) and np.isnan(value):
+            value = None
+        summary[key] = value
+
+    return summary
+
+
+def to_json_list(values: np.ndarray) -> List[Optional[float]]:
+    """Convert a column to a list with None in place of NaN"""
+    return [None if np.isnan(value) else value for value in values.tolist()]
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
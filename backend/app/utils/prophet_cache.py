@@ -0,0 +1,196 @@
+import asyncio
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class ProphetModelCache:
+    """Fitted Prophet models per (project, metric), stored as JSON.
+
+    Each entry carries the history version it was fitted on, so a lookup
+    with a newer version misses and the stale model is dropped. Entries
+    are evicted least recently used once the serialized size exceeds
+    `max_bytes`, and every entry is mirrored to disk to survive restarts.
+    Files on disk are pruned least recently used past `max_disk_bytes`,
+    and all file I/O runs on worker threads.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_disk_bytes: int = 1024 * 1024 * 1024
+    ):
+        self.root = root or os.path.join(
+            os.environ.get('MODEL_REGISTRY_DIR', 'models'),
+            'prophet'
+        )
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, str]]" = (
+            OrderedDict()
+        )
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    async def get(
+        self,
+        project_id: str,
+        metric: str,
+        version: str
+    ) -> Optional[str]:
+        """Get the serialized model fitted on `version` of the history"""
+        key = (project_id, metric)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                if entry[0] == version:
+                    self._entries.move_to_end(key)
+                    return entry[1]
+
+                # New history rows arrived since this model was fitted
+                self._drop(key)
+
+        stored = await asyncio.to_thread(self._read, key)
+        if stored is None or stored[0] != version:
+            return None
+
+        with self._lock:
+            self._insert(key, *stored)
+        return stored[1]
+
+    async def put(
+        self,
+        project_id: str,
+        metric: str,
+        version: str,
+        model_json: str
+    ) -> None:
+        """Cache a serialized model fitted on `version` of the history"""
+        key = (project_id, metric)
+
+        with self._lock:
+            self._drop(key)
+            self._insert(key, version, model_json)
+
+        await asyncio.to_thread(self._write, key, version, model_json)
+
+    async def invalidate(
+        self,
+        project_id: str,
+        metric: Optional[str] = None
+    ) -> None:
+        """Drop cached models of a project, or of one of its metrics"""
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == project_id and metric in (None, key[1]):
+                    self._drop(key)
+
+        await asyncio.to_thread(self._remove, project_id, metric)
+
+    def _insert(
+        self,
+        key: Tuple[str, str],
+        version: str,
+        model_json: str
+    ) -> None:
+        """Add an entry and evict the least recently used over budget"""
+        self._entries[key] = (version, model_json)
+        self._bytes += len(model_json)
+
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        """Remove an entry from memory"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def _read(self, key: Tuple[str, str]) -> Optional[Tuple[str, str]]:
+        """Read a persisted entry"""
+        path = os.path.join(self._directory(key[0]), self._filename(key[1]))
+
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        # Pruning goes by modification time, so mark the file as used
+        os.utime(path)
+        return stored["version"], stored["model"]
+
+    def _write(
+        self,
+        key: Tuple[str, str],
+        version: str,
+        model_json: str
+    ) -> None:
+        """Persist an entry, replacing the previous file atomically"""
+        directory = self._directory(key[0])
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self._filename(key[1]))
+
+        with open(path + '.tmp', 'w') as f:
+            json.dump({"version": version, "model": model_json}, f)
+        os.replace(path + '.tmp', path)
+
+        self._prune(keep=path)
+
+    def _remove(
+        self,
+        project_id: str,
+        metric: Optional[str]
+    ) -> None:
+        """Delete persisted models of a project, or of one of its metrics"""
+        directory = self._directory(project_id)
+        if not os.path.isdir(directory):
+            return
+
+        for entry in os.listdir(directory):
+            if metric is None or entry == self._filename(metric):
+                os.remove(os.path.join(directory, entry))
+
+    def _prune(self, keep: str) -> None:
+        """Delete least recently used files until the disk budget holds"""
+        files = []
+
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            if path == keep:
+                continue
+
+            # Another worker may have pruned or replaced it already
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _directory(self, project_id: str) -> str:
+        """Get the directory holding a project's models"""
+        return os.path.join(self.root, re.sub(r'[^\w.-]', '_', project_id))
+
+    def _filename(self, metric: str) -> str:
+        """Get the file name of a metric's model"""
+        return re.sub(r'[^\w.-]', '_', metric) + '.json'
@@ -0,0 +1,141 @@
+from typing import Any, AsyncIterable, Dict, Iterable, List
+import numpy as np
+
+
+class ColumnarHistoryBuilder:
+    """Accumulate RiskMetric rows straight into typed NumPy columns.
+
+    Columns grow by doubling, so loading n rows costs O(n) copies and never
+    holds a Python list per field. Factor columns are in first-seen order,
+    which differs between histories; use `align_factors` before building
+    features from them.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self._size = 0
+        self._timestamps = np.empty(capacity, dtype='datetime64[us]')
+        self._levels = np.empty(capacity, dtype=np.float32)
+        self._factors = np.zeros((capacity, 0), dtype=np.float32)
+        self._factor_index: Dict[str, int] = {}
+
+    def append(self, metric: Any) -> None:
+        """Add one RiskMetric row"""
+        if self._size == len(self._levels):
+            self._grow(len(self._levels) * 2, self._factors.shape[1])
+
+        row = self._size
+        self._timestamps[row] = np.datetime64(metric.timestamp, 'us')
+        self._levels[row] = metric.risk_level
+
+        for name, value in (metric.contributing_factors or {}).items():
+            column = self._factor_index.get(name)
+
+            # Unseen factors add a zero-filled column
+            if column is None:
+                column = len(self._factor_index)
+                self._factor_index[name] = column
+                self._grow(len(self._levels), column + 1)
+
+            self._factors[row, column] = value
+
+        self._size += 1
+
+    def extend(self, metrics: Iterable[Any]) -> None:
+        """Add a batch of RiskMetric rows"""
+        for metric in metrics:
+            self.append(metric)
+
+    def build(self) -> Dict:
+        """Get the history as trimmed columns"""
+        size = self._size
+
+        return {
+            "timestamps": self._timestamps[:size].copy(),
+            "risk_levels": self._levels[:size].copy(),
+            "factors": self._factors[:size].copy(),
+            "factor_names": sorted(
+                self._factor_index,
+                key=self._factor_index.get
+            )
+        }
+
+    def _grow(
+        self,
+        rows: int,
+        columns: int
+    ) -> None:
+        """Resize the backing arrays, keeping existing values"""
+        if rows != len(self._levels):
+            self._timestamps = np.resize(self._timestamps, rows)
+            self._levels = np.resize(self._levels, rows)
+
+        factors = np.zeros((rows, columns), dtype=np.float32)
+        old_rows, old_columns = self._factors.shape
+        factors[:old_rows, :old_columns] = self._factors
+        self._factors = factors
+
+
+def factor_vocabulary(histories: Iterable[Dict]) -> List[str]:
+    """Get the sorted union of factor names across histories"""
+    return sorted({
+        name for history in histories for name in history["factor_names"]
+    })
+
+
+def align_factors(
+    history: Dict,
+    factor_names: List[str]
+) -> Dict:
+    """Reindex a history's factor matrix to a fixed factor vocabulary.
+
+    Factors missing from the history are zero-filled and factors outside
+    the vocabulary are dropped, so every history aligned to the same names
+    has the same feature layout.
+    """
+    positions = {
+        name: column for column, name in enumerate(history["factor_names"])
+    }
+    factors = np.zeros(
+        (len(history["risk_levels"]), len(factor_names)),
+        dtype=np.float32
+    )
+
+    for column, name in enumerate(factor_names):
+        source = positions.get(name)
+        if source is not None:
+            factors[:, column] = history["factors"][:, source]
+
+    return {
+        **history,
+        "factors": factors,
+        "factor_names": list(factor_names)
+    }
+
+
+async def load_columnar_history(batches: AsyncIterable[List[Any]]) -> Dict:
+    """Stream batches of RiskMetric rows into columnar history"""
+    builder = ColumnarHistoryBuilder()
+
+    async for batch in batches:
+        builder.extend(batch)
+
+    return builder.build()
+
+
+async def load_columnar_histories(
+    project_ids: List[str],
+    batches: AsyncIterable[List[Any]]
+) -> Dict[str, Dict]:
+    """Stream RiskMetric rows of many projects into per-project columns"""
+    builders = {
+        project_id: ColumnarHistoryBuilder() for project_id in project_ids
+    }
+
+    async for batch in batches:
+        for metric in batch:
+            builders[metric.project_id].append(metric)
+
+    return {
+        project_id: builder.build()
+        for project_id, builder in builders.items()
+    }
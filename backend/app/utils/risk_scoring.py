@@ -0,0 +1,145 @@
+from typing import Dict, List
+import numpy as np
+
+# Portfolio-wide scoring only; single-project assessment keeps the per-risk
+# _calculate_* methods of RiskManagementService. The fields and weights are
+# an assumed schema for what the _identify_*_risks steps provide, not a
+# port of those methods.
+
+# Fields every risk must carry to be scored
+RISK_COLUMNS = (
+    "likelihood",
+    "cost_impact",
+    "budget",
+    "schedule_impact_days",
+    "duration_days",
+    "days_until_due"
+)
+
+CATEGORY_WEIGHTS = {
+    "technical": 1.0,
+    "supply": 1.1,
+    "financial": 1.2,
+    "timeline": 0.9
+}
+
+
+class VectorizedRiskScorer:
+    def __init__(
+        self,
+        cost_weight: float = 0.6,
+        urgency_horizon_days: float = 30.0
+    ):
+        self.cost_weight = cost_weight
+        self.urgency_horizon_days = urgency_horizon_days
+
+    def score(self, risks: List[Dict]) -> List[Dict]:
+        """Score a list of risks in one vectorized pass.
+
+        Risks missing a required field are not scored: their scores are
+        None and the absent fields are listed under `missingFields`.
+        """
+        if not risks:
+            return []
+
+        scores = self.score_columns(self._pack(risks))
+        results = []
+
+        for i, risk in enumerate(risks):
+            missing = [
+                name for name in RISK_COLUMNS if risk.get(name) is None
+            ]
+            results.append({
+                **risk,
+                **{
+                    name: None if missing else float(values[i])
+                    for name, values in scores.items()
+                },
+                "missingFields": missing
+            })
+
+        return results
+
+    def score_many(
+        self,
+        risks_by_project: Dict[str, List[Dict]]
+    ) -> Dict[str, List[Dict]]:
+        """Score risks from many projects together, split per project"""
+        project_ids = list(risks_by_project)
+        scored = self.score([
+            risk
+            for project_id in project_ids
+            for risk in risks_by_project[project_id]
+        ])
+
+        results = {}
+        offset = 0
+
+        for project_id in project_ids:
+            count = len(risks_by_project[project_id])
+            results[project_id] = scored[offset:offset + count]
+            offset += count
+
+        return results
+
+    def score_columns(
+        self,
+        columns: Dict[str, np.ndarray]
+    ) -> Dict[str, np.ndarray]:
+        """Compute the four risk scores from columnar inputs"""
+        probability = np.clip(
+            columns["likelihood"] * columns["category_weight"],
+            0.0,
+            1.0
+        )
+
+        cost_share = columns["cost_impact"] / np.maximum(columns["budget"], 1.0)
+        schedule_share = (
+            columns["schedule_impact_days"]
+            / np.maximum(columns["duration_days"], 1.0)
+        )
+        impact = np.clip(
+            self.cost_weight * cost_share
+            + (1 - self.cost_weight) * schedule_share,
+            0.0,
+            1.0
+        )
+
+        severity = probability * impact
+
+        # Risks due sooner are more urgent at the same severity
+        urgency = severity / (
+            1.0
+            + np.maximum(columns["days_until_due"], 0.0)
+            / self.urgency_horizon_days
+        )
+
+        return {
+            "probability": probability,
+            "impact": impact,
+            "severity": severity,
+            "urgency": urgency
+        }
+
+    def _pack(self, risks: List[Dict]) -> Dict[str, np.ndarray]:
+        """Pack risk dicts into float64 columns, NaN where a field is missing"""
+        count = len(risks)
+
+        columns = {
+            name: np.fromiter(
+                (
+                    np.nan if risk.get(name) is None else float(risk[name])
+                    for risk in risks
+                ),
+                dtype=np.float64,
+                count=count
+            )
+            for name in RISK_COLUMNS
+        }
+        columns["category_weight"] = np.fromiter(
+            (CATEGORY_WEIGHTS.get(risk.get("category"), 1.0) for risk in risks),
+            dtype=np.float64,
+            count=count
+        )
+
+        return columns
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+Loader = Callable[[], Awaitable[Any]]
+
+
+class StaleWhileRevalidateCache:
+    def __init__(
+        self,
+        ttl: float = 30.0,
+        max_stale: float = 300.0,
+        max_entries: int = 1024
+    ):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = (
+            OrderedDict()
+        )
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {
+            "hits": 0,
+            "staleHits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "coalesced": 0,
+            "evictions": 0
+        }
+
+    async def get(
+        self,
+        key: Hashable,
+        loader: Loader
+    ) -> Any:
+        """Get a cached value, loading or revalidating it as needed"""
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+
+            if age < self.ttl:
+                self.stats["hits"] += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+
+            # Serve the stale value and refresh it in the background
+            if age < self.ttl + self.max_stale:
+                self.stats["staleHits"] += 1
+                self._entries.move_to_end(key)
+                self._refresh(key, loader)
+                return entry[1]
+
+            # Too old to serve at all
+            del self._entries[key]
+
+        self.stats["misses"] += 1
+
+        # Shield the shared load so one cancelled caller can't abort it
+        return await asyncio.shield(self._refresh(key, loader))
+
+    def peek(self, key: Hashable) -> Any:
+        """Get the stored value of a key regardless of age, or None"""
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one entry, or every entry when no key is given"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _refresh(
+        self,
+        key: Hashable,
+        loader: Loader
+    ) -> asyncio.Task:
+        """Start a load for a key unless one is already running"""
+        task = self._inflight.get(key)
+
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return task
+
+        self.stats["refreshes"] += 1
+        task = asyncio.ensure_future(loader())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._store(key, done))
+
+        return task
+
+    def _store(
+        self,
+        key: Hashable,
+        task: asyncio.Task
+    ) -> None:
+        """Record the result of a finished load"""
+        self._inflight.pop(key, None)
+
+        # Failed loads keep the previous entry; callers awaiting the
+        # task still see the exception
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        now = time.monotonic()
+        self._entries[key] = (now, task.result())
+        self._entries.move_to_end(key)
+        self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then the least recently used over budget"""
+        expired = [
+            key for key, (stored, _) in self._entries.items()
+            if now - stored >= self.ttl + self.max_stale
+        ]
+        for key in expired:
+            del self._entries[key]
+        self.stats["evictions"] += len(expired)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
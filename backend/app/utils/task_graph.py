@@ -0,0 +1,61 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple
+
+
+class TaskGraph:
+    """A small DAG of coroutine steps.
+
+    Each step starts as soon as the steps it depends on finish and receives
+    their results as positional arguments, so shared inputs are computed
+    once and independent steps overlap.
+    """
+
+    def __init__(self):
+        self._steps: Dict[str, Tuple[Callable[..., Awaitable], Tuple]] = {}
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Awaitable],
+        depends_on: Iterable[str] = ()
+    ) -> "TaskGraph":
+        """Register a step; dependencies must already be registered"""
+        depends_on = tuple(depends_on)
+
+        # Requiring dependencies up front also rules out cycles
+        missing = [d for d in depends_on if d not in self._steps]
+        if missing:
+            raise ValueError(f"Step {name} depends on unknown steps {missing}")
+        if name in self._steps:
+            raise ValueError(f"Step {name} is already registered")
+
+        self._steps[name] = (fn, depends_on)
+        return self
+
+    async def run(self) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Run every step and return results plus per-step timings in ms"""
+        tasks: Dict[str, asyncio.Future] = {}
+        timings: Dict[str, float] = {}
+
+        async def run_step(name: str) -> Any:
+            fn, depends_on = self._steps[name]
+            inputs = [await tasks[d] for d in depends_on]
+            started = time.perf_counter()
+
+            try:
+                return await fn(*inputs)
+            finally:
+                timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+        for name in self._steps:
+            tasks[name] = asyncio.ensure_future(run_step(name))
+
+        try:
+            results = await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        return dict(zip(tasks, results)), timings